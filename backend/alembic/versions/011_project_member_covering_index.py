@@ -0,0 +1,39 @@
+"""project_member covering index for RBAC lookups
+
+Revision ID: 011_pm_covering_index
+Revises: 010_add_document_types
+Create Date: 2026-01-05 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '011_pm_covering_index'
+down_revision: Union[str, None] = '010_add_document_types'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Replace the plain unique (project_id, user_id) index with a unique covering index
+    # that also carries role_code/expires_at, so RBAC checks become index-only scans.
+    # Built CONCURRENTLY (outside a transaction) so project_members, read by every RBAC
+    # check, stays writable during the build.
+    # Note: run VACUUM on project_members after deploy so the visibility map is current.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_pm_proj_user_role_covering "
+            "ON project_members (project_id, user_id) INCLUDE (role_code, expires_at)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_project_member_project_user")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_project_member_project_user "
+            "ON project_members (project_id, user_id)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_pm_proj_user_role_covering")
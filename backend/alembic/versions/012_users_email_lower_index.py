@@ -0,0 +1,28 @@
+"""users lower(email) unique index
+
+Revision ID: 012_users_email_lower
+Revises: 011_pm_covering_index
+Create Date: 2026-01-05 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '012_users_email_lower'
+down_revision: Union[str, None] = '011_pm_covering_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Functional unique index so case-insensitive email lookups are indexed
+    # and users differing only by email case can't be created.
+    # Fails if such duplicates already exist - merge them first.
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_lower', table_name='users')
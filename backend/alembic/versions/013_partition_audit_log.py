@@ -0,0 +1,112 @@
+"""partition audit_log by created_at range
+
+Revision ID: 013_partition_audit_log
+Revises: 012_users_email_lower
+Create Date: 2026-01-05 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '013_partition_audit_log'
+down_revision: Union[str, None] = '012_users_email_lower'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, org_id, project_id, actor_user_id, action, entity_type, entity_id, before_json, after_json, created_at, ip, user_agent"
+
+
+def upgrade() -> None:
+    # Move the existing table out of the way (indexes/PK names must be freed too)
+    op.execute("ALTER TABLE audit_log RENAME TO audit_log_old")
+    op.execute("ALTER TABLE audit_log_old RENAME CONSTRAINT audit_log_pkey TO audit_log_old_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_audit_project_created")
+    op.execute("DROP INDEX IF EXISTS ix_audit_actor_created")
+    op.execute("DROP INDEX IF EXISTS ix_audit_log_id")
+
+    # Partitioned parent - partition key must be part of the primary key
+    op.create_table(
+        'audit_log',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('org_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('actor_user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('action', sa.String(), nullable=False),
+        sa.Column('entity_type', sa.String(), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('before_json', postgresql.JSONB, nullable=True),
+        sa.Column('after_json', postgresql.JSONB, nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('ip', sa.String(), nullable=True),
+        sa.Column('user_agent', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['org_id'], ['orgs.id'], name='audit_log_org_id_fkey'),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], name='audit_log_project_id_fkey'),
+        sa.ForeignKeyConstraint(['actor_user_id'], ['users.id'], name='audit_log_actor_user_id_fkey'),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    op.create_index('ix_audit_log_id', 'audit_log', ['id'])
+    op.create_index('ix_audit_project_created', 'audit_log', ['project_id', 'created_at'])
+    op.create_index('ix_audit_actor_created', 'audit_log', ['actor_user_id', 'created_at'])
+
+    # Monthly partitions covering existing rows through next month, plus a DEFAULT catch-all.
+    # New months are created on app startup and re-checked daily (app.services.audit.ensure_audit_log_partitions).
+    op.execute("""
+        DO $$
+        DECLARE
+            month_start date := date_trunc('month', COALESCE((SELECT min(created_at) FROM audit_log_old), now()))::date;
+            last_month date := (date_trunc('month', now()) + interval '1 month')::date;
+        BEGIN
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF audit_log FOR VALUES FROM (%L) TO (%L)',
+                    'audit_log_' || to_char(month_start, 'YYYY_MM'),
+                    month_start,
+                    (month_start + interval '1 month')::date
+                );
+                month_start := (month_start + interval '1 month')::date;
+            END LOOP;
+        END $$;
+    """)
+    op.execute("CREATE TABLE IF NOT EXISTS audit_log_default PARTITION OF audit_log DEFAULT")
+
+    op.execute(f"INSERT INTO audit_log ({COLUMNS}) SELECT {COLUMNS} FROM audit_log_old")
+    op.drop_table('audit_log_old')
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE audit_log RENAME TO audit_log_partitioned")
+    op.execute("ALTER TABLE audit_log_partitioned RENAME CONSTRAINT audit_log_pkey TO audit_log_partitioned_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_audit_project_created")
+    op.execute("DROP INDEX IF EXISTS ix_audit_actor_created")
+    op.execute("DROP INDEX IF EXISTS ix_audit_log_id")
+
+    op.create_table(
+        'audit_log',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('org_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('actor_user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('action', sa.String(), nullable=False),
+        sa.Column('entity_type', sa.String(), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('before_json', postgresql.JSONB, nullable=True),
+        sa.Column('after_json', postgresql.JSONB, nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('ip', sa.String(), nullable=True),
+        sa.Column('user_agent', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['org_id'], ['orgs.id'], name='audit_log_org_id_fkey'),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], name='audit_log_project_id_fkey'),
+        sa.ForeignKeyConstraint(['actor_user_id'], ['users.id'], name='audit_log_actor_user_id_fkey'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_audit_log_id', 'audit_log', ['id'])
+    op.create_index('ix_audit_project_created', 'audit_log', ['project_id', 'created_at'])
+    op.create_index('ix_audit_actor_created', 'audit_log', ['actor_user_id', 'created_at'])
+
+    op.execute(f"INSERT INTO audit_log ({COLUMNS}) SELECT {COLUMNS} FROM audit_log_partitioned")
+    op.execute("DROP TABLE audit_log_partitioned CASCADE")
@@ -0,0 +1,51 @@
+"""drop redundant indexes on primary key columns
+
+Revision ID: 014_drop_pk_indexes
+Revises: 013_partition_audit_log
+Create Date: 2026-01-05 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '014_drop_pk_indexes'
+down_revision: Union[str, None] = '013_partition_audit_log'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Postgres already backs every primary key with a unique btree, so the
+# ix_<table>_id indexes created by index=True were pure duplicates
+TABLES = [
+    'orgs',
+    'users',
+    'project_folders',
+    'projects',
+    'project_members',
+    'templates',
+    'documents',
+    'document_versions',
+    'approvals',
+    'review_comments',
+    'tasks',
+    'reminders',
+    'escalations',
+    'gates',
+    'gantt_items',
+    'evidence',
+    'pkb_snapshots',
+    'ai_runs',
+    'audit_log',
+    'document_types',
+]
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_id")
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_id ON {table} (id)")
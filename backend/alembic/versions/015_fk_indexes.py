@@ -0,0 +1,55 @@
+"""add indexes on foreign key columns used in joins and filters
+
+Revision ID: 015_fk_indexes
+Revises: 014_drop_pk_indexes
+Create Date: 2026-01-07 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '015_fk_indexes'
+down_revision: Union[str, None] = '014_drop_pk_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column) - index name follows the model's index=True naming: ix_<table>_<column>
+FK_COLUMNS = [
+    ('project_folders', 'org_id'),
+    ('project_folders', 'parent_folder_id'),
+    ('projects', 'org_id'),
+    ('projects', 'folder_id'),
+    ('project_members', 'user_id'),
+    ('templates', 'org_id'),
+    ('documents', 'project_id'),
+    ('document_versions', 'template_id'),
+    ('review_comments', 'document_version_id'),
+    ('reminders', 'task_id'),
+    ('escalations', 'task_id'),
+    ('gates', 'project_id'),
+    ('gantt_items', 'project_id'),
+    ('evidence', 'project_id'),
+    ('pkb_snapshots', 'project_id'),
+    ('ai_runs', 'project_id'),
+]
+
+
+def upgrade() -> None:
+    # Tables created by 001_initial already use UUID keys, so only the indexes are missing.
+    # Some tables may not exist on older databases - skip those.
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for table, column in FK_COLUMNS:
+        if table in tables:
+            op.create_index(f'ix_{table}_{column}', table, [column], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    # ix_projects_folder_id and ix_project_folders_org_id belong to 007_add_project_folders
+    for table, column in FK_COLUMNS:
+        if (table, column) in (('projects', 'folder_id'), ('project_folders', 'org_id')):
+            continue
+        op.execute(f'DROP INDEX IF EXISTS ix_{table}_{column}')
@@ -0,0 +1,41 @@
+"""store SHA-256 hashes as raw bytes (BYTEA) instead of hex strings
+
+Revision ID: 017_hashes_bytea
+Revises: 015_fk_indexes
+Create Date: 2026-01-08 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '017_hashes_bytea'
+down_revision: Union[str, None] = '015_fk_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+HASH_COLUMNS = [
+    ('templates', 'file_hash'),
+    ('templates', 'pdf_hash'),
+    ('document_versions', 'file_hash'),
+    ('document_versions', 'pdf_hash'),
+    ('approvals', 'evidence_hash'),
+    ('evidence', 'file_hash'),
+    ('pkb_snapshots', 'hash'),
+    ('ai_runs', 'input_hash'),
+    ('ai_runs', 'output_hash'),
+]
+
+
+def upgrade() -> None:
+    # Values are sha256 hexdigests written by the app, so decode() halves them to 32 bytes
+    for table, column in HASH_COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN "{column}" TYPE bytea USING decode("{column}", \'hex\')')
+    op.create_index('ix_doc_version_file_hash', 'document_versions', ['file_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_doc_version_file_hash', table_name='document_versions')
+    for table, column in HASH_COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN "{column}" TYPE varchar USING encode("{column}", \'hex\')')
@@ -0,0 +1,41 @@
+"""composite index for membership access checks, lower(code) index on document_types
+
+Revision ID: 018_hot_filter_indexes
+Revises: 017_hashes_bytea
+Create Date: 2026-01-09 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '018_hot_filter_indexes'
+down_revision: Union[str, None] = '017_hashes_bytea'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction; project_members stays writable during the build
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_pm_user_expires "
+            "ON project_members (user_id, expires_at)"
+        )
+        # Covered by the composite index (user_id is its leading column)
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_project_members_user_id")
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_document_type_code_lower "
+            "ON document_types (lower(code))"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_document_type_code_lower")
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_project_members_user_id "
+            "ON project_members (user_id)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_pm_user_expires")
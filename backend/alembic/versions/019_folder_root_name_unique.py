@@ -0,0 +1,32 @@
+"""unique root folder names per org (uq_folder_org_name_parent treats NULL parents as distinct)
+
+Revision ID: 019_folder_root_name_unique
+Revises: 018_hot_filter_indexes
+Create Date: 2026-01-10 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '019_folder_root_name_unique'
+down_revision: Union[str, None] = '018_hot_filter_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # create_folder/update_folder rely on the DB to reject duplicate names (IntegrityError -> 400)
+    op.create_index(
+        'uq_folder_org_root_name',
+        'project_folders',
+        ['org_id', 'name'],
+        unique=True,
+        postgresql_where=sa.text('parent_folder_id IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_folder_org_root_name', table_name='project_folders')
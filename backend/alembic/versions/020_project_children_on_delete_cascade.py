@@ -0,0 +1,35 @@
+"""ON DELETE CASCADE from projects to project_members and tasks
+
+Revision ID: 020_project_delete_cascade
+Revises: 019_folder_root_name_unique
+Create Date: 2026-01-11 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '020_project_delete_cascade'
+down_revision: Union[str, None] = '019_folder_root_name_unique'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, FK constraint name) - Postgres default names, the constraints were created unnamed
+PROJECT_CHILD_FKS = [
+    ('project_members', 'project_members_project_id_fkey'),
+    ('tasks', 'tasks_project_id_fkey'),
+]
+
+
+def upgrade() -> None:
+    # delete_project issues a single DELETE FROM projects; members and tasks go with it
+    for table, constraint in PROJECT_CHILD_FKS:
+        op.drop_constraint(constraint, table, type_='foreignkey')
+        op.create_foreign_key(constraint, table, 'projects', ['project_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    for table, constraint in PROJECT_CHILD_FKS:
+        op.drop_constraint(constraint, table, type_='foreignkey')
+        op.create_foreign_key(constraint, table, 'projects', ['project_id'], ['id'])
@@ -0,0 +1,41 @@
+"""composite indexes for the project task list and /my-tasks filters
+
+Revision ID: 021_task_list_indexes
+Revises: 020_project_delete_cascade
+Create Date: 2026-01-12 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '021_task_list_indexes'
+down_revision: Union[str, None] = '020_project_delete_cascade'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction; tasks stays writable during the build
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_task_project_stage_status "
+            "ON tasks (project_id, raci_stage, status)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_task_assignee_status_created "
+            "ON tasks (assigned_to_user_id, status, created_at DESC)"
+        )
+        # Prefix of the new assignee index
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_task_assigned_status")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_task_assigned_status "
+            "ON tasks (assigned_to_user_id, status)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_task_assignee_status_created")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_task_project_stage_status")
@@ -0,0 +1,35 @@
+"""composite indexes for RACI task lookups and title duplicate detection
+
+Revision ID: 022_task_raci_indexes
+Revises: 021_task_list_indexes
+Create Date: 2026-01-13 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '022_task_raci_indexes'
+down_revision: Union[str, None] = '021_task_list_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction; tasks stays writable during the build
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_task_project_raci "
+            "ON tasks (project_id, raci_stage, raci_task_name, required_role)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_task_project_title "
+            "ON tasks (project_id, title)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_task_project_title")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_task_project_raci")
@@ -23,6 +23,9 @@ class Settings(BaseSettings):
     s3_secret_key: str = "minioadmin"
     s3_bucket: str = "dms"
     
+    # Redis (optional cache; in-process cache is used when not set)
+    redis_url: Optional[str] = None
+    
     # JWT Authentication
     jwt_secret: str = "super-secret-jwt-key-change-in-production"
     jwt_algorithm: str = "HS256"
@@ -1,4 +1,7 @@
+from typing import AsyncGenerator
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 import logging
 
@@ -30,11 +33,26 @@ try:
         pool_recycle=3600,  # Recycle connections after 1 hour
         echo=False,  # Set to True for SQL query logging
     )
+    # Same database through psycopg's async driver, for async def routes
+    async_engine = create_async_engine(
+        db_url,
+        pool_pre_ping=True,
+        connect_args={
+            "connect_timeout": 10,
+            "sslmode": "require" if "neon.tech" in db_url else None,
+        },
+        pool_timeout=10,
+        pool_recycle=3600,
+        echo=False,
+    )
     logger.info("Database engine created successfully")
 except Exception as e:
     logger.error(f"Error creating database engine: {e}")
     raise
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: INSERT/UPDATE already leave the in-memory objects current (all defaults are
+# client-side), so responses serialized after commit don't need a reload SELECT (or an awaited one)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
@@ -46,3 +64,7 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
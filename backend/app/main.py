@@ -1,16 +1,21 @@
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.orm import Session
 import traceback
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 # Configure logging FIRST
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Request threads only enqueue records; a background listener thread does the stream I/O
+_log_queue = queue.Queue(-1)
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
+_log_listener = QueueListener(_log_queue, _log_stream_handler, respect_handler_level=True)
+_log_listener.start()
 logger = logging.getLogger(__name__)
 
 logger.info("Starting application import...")
@@ -27,7 +32,8 @@ logger.info("✅ Enums imported")
 from app.routers import auth, projects, members, templates, documents, users, folders, document_types
 logger.info("✅ Routers imported")
 
-app = FastAPI(title="DMS Governance API", version="0.1.0")
+# orjson encodes the large content_json / template manifest payloads much faster than stdlib json
+app = FastAPI(title="DMS Governance API", version="0.1.0", default_response_class=ORJSONResponse)
 
 # CORS middleware - must be added before exception handlers
 # Get allowed origins from environment or use defaults
@@ -242,6 +248,15 @@ async def startup_event():
     logger.info("Startup event triggered")
     print("STARTUP: Event triggered - server is ready to accept requests")
     
+    # The in-process cache fallback can't be invalidated across workers
+    from app.config import get_settings
+    workers = os.getenv("WEB_CONCURRENCY", "1")
+    if not get_settings().redis_url and workers.isdigit() and int(workers) > 1:
+        logger.warning(
+            f"Running {workers} workers without REDIS_URL: the in-process cache is per worker and "
+            "only meant for single-process development; membership lookups will bypass the cache"
+        )
+    
     # Don't block startup - run initialization in background thread
     import threading
     
@@ -259,6 +274,14 @@ async def startup_event():
             traceback.print_exc()
             return  # Don't continue if table creation fails
         
+        try:
+            # Creates upcoming audit_log partitions now and again every day
+            from app.services.audit import start_audit_partition_maintenance
+            start_audit_partition_maintenance()
+            logger.info("Audit log partition maintenance started")
+        except Exception as e:
+            logger.error(f"Error starting audit log partition maintenance: {e}")
+        
         try:
             logger.info("Seeding roles...")
             print("STARTUP: Seeding roles...")
@@ -290,6 +313,15 @@ async def startup_event():
     print("STARTUP: Event completed - server ready to accept requests")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush queued audit entries and log records on shutdown."""
+    from app.services.audit import flush_audit_log, stop_audit_partition_maintenance
+    stop_audit_partition_maintenance()
+    flush_audit_log()
+    _log_listener.stop()
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Any, Optional
 
 from sqlalchemy import (
     Column,
@@ -11,11 +12,14 @@ from sqlalchemy import (
     UniqueConstraint,
     Index,
     JSON,
+    LargeBinary,
     Text,
+    TypeDecorator,
+    func,
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID as PostgresUUID
 import uuid
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.enums import (
     RoleCode,
@@ -35,13 +39,31 @@ from app.db import Base
 
 
 def utcnow():
-    return datetime.utcnow()
+    """Current UTC time as a naive datetime, matching how the DateTime columns are stored"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class Sha256Digest(TypeDecorator):
+    """SHA-256 digest stored as raw 32 bytes (BYTEA), exposed to Python as a hex string."""
+
+    impl = LargeBinary(32)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, bytes):
+            return value
+        return bytes.fromhex(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return bytes(value).hex()
 
 
 class Org(Base):
     __tablename__ = "orgs"
 
-    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, nullable=False)
     created_at = Column(DateTime, default=utcnow, nullable=False)
 
@@ -49,7 +71,7 @@ class Org(Base):
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, nullable=False, index=True)
     name = Column(String, nullable=False)
     password_hash = Column(String, nullable=True)
@@ -57,6 +79,11 @@ class User(Base):
     auth_provider = Column(String, default="local", nullable=False)
     created_at = Column(DateTime, default=utcnow, nullable=False)
 
+    # Case-insensitive email lookups (login, token auth) use lower(email)
+    __table_args__ = (Index("ix_users_email_lower", func.lower(email), unique=True),)
+
+    audit_logs = relationship("AuditLog", foreign_keys="AuditLog.actor_user_id", back_populates="actor")
+
 
 class Role(Base):
     __tablename__ = "roles"
@@ -68,26 +95,31 @@ class Role(Base):
 class ProjectFolder(Base):
     __tablename__ = "project_folders"
 
-    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    org_id = Column(PostgresUUID(as_uuid=True), ForeignKey("orgs.id"), nullable=False)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    org_id = Column(PostgresUUID(as_uuid=True), ForeignKey("orgs.id"), nullable=False, index=True)
     name = Column(String, nullable=False)
-    parent_folder_id = Column(PostgresUUID(as_uuid=True), ForeignKey("project_folders.id"), nullable=True)
+    parent_folder_id = Column(PostgresUUID(as_uuid=True), ForeignKey("project_folders.id"), nullable=True, index=True)
     created_by = Column(PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=utcnow, nullable=False)
 
-    __table_args__ = (UniqueConstraint("org_id", "name", "parent_folder_id", name="uq_folder_org_name_parent"),)
+    __table_args__ = (
+        UniqueConstraint("org_id", "name", "parent_folder_id", name="uq_folder_org_name_parent"),
+        # NULLs are distinct in the constraint above, so root folder names need their own unique index
+        Index("uq_folder_org_root_name", "org_id", "name", unique=True, postgresql_where=parent_folder_id.is_(None)),
+    )
 
     org = relationship("Org")
-    parent_folder = relationship("ProjectFolder", remote_side=[id], backref="subfolders")
+    parent_folder = relationship("ProjectFolder", remote_side=[id], back_populates="subfolders")
+    subfolders = relationship("ProjectFolder", back_populates="parent_folder")
     creator = relationship("User")
 
 
 class Project(Base):
     __tablename__ = "projects"
 
-    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    org_id = Column(PostgresUUID(as_uuid=True), ForeignKey("orgs.id"), nullable=False)
-    folder_id = Column(PostgresUUID(as_uuid=True), ForeignKey("project_folders.id"), nullable=True)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    org_id = Column(PostgresUUID(as_uuid=True), ForeignKey("orgs.id"), nullable=False, index=True)
+    folder_id = Column(PostgresUUID(as_uuid=True), ForeignKey("project_folders.id"), nullable=True, index=True)
     key = Column(String, nullable=False)
     name = Column(String, nullable=False)
     status = Column(String, default="ACTIVE", nullable=False)
@@ -99,13 +131,16 @@ class Project(Base):
 
     org = relationship("Org")
     folder = relationship("ProjectFolder")
+    # passive_deletes: rows go with the project via ON DELETE CASCADE, without loading them first
+    members = relationship("ProjectMember", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    tasks = relationship("Task", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class ProjectMember(Base):
     __tablename__ = "project_members"
 
-    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    project_id = Column(PostgresUUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(PostgresUUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     role_code = Column(String, nullable=False)  # Removed ForeignKey to allow custom roles from RACI
     is_temporary = Column(Boolean, default=False, nullable=False)
@@ -114,12 +149,22 @@ class ProjectMember(Base):
     created_at = Column(DateTime, default=utcnow, nullable=False)
 
     __table_args__ = (
-        Index("ix_project_member_project_user", "project_id", "user_id", unique=True),
+        # Covering index for the RBAC lookup (project_id, user_id) -> role_code/expires_at,
+        # lets Postgres answer membership checks with an index-only scan
+        Index(
+            "ix_pm_proj_user_role_covering",
+            "project_id",
+            "user_id",
+            unique=True,
+            postgresql_include=["role_code", "expires_at"],
+        ),
         Index("ix_project_member_project_role", "project_id", "role_code"),
         Index("ix_project_member_expires_at", "expires_at"),
+        # "my memberships" access checks: user_id = :uid AND (expires_at IS NULL OR expires_at > now())
+        Index("ix_pm_user_expires", "user_id", "expires_at"),
     )
 
-    project = relationship("Project")
+    project = relationship("Project", back_populates="members")
     user = relationship("User", foreign_keys=[user_id])
     inviter = relationship("User", foreign_keys=[invited_by])
 
@@ -127,15 +172,15 @@ class ProjectMember(Base):
 class Template(Base):
     __tablename__ = "templates"
 
-    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    org_id = Column(PostgresUUID(as_uuid=True), ForeignKey("orgs.id"), nullable=False)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    org_id = Column(PostgresUUID(as_uuid=True), ForeignKey("orgs.id"), nullable=False, index=True)
     doc_type = Column(String, nullable=False)
     name = Column(String, nullable=False)
     version = Column(String, default="v1", nullable=False)
     object_key = Column(String, nullable=False)
-    file_hash = Column(String, nullable=False)
+    file_hash = Column(Sha256Digest, nullable=False)
     pdf_object_key = Column(String, nullable=True)  # PDF version of the template
-    pdf_hash = Column(String, nullable=True)  # Hash of PDF file
+    pdf_hash = Column(Sha256Digest, nullable=True)  # Hash of PDF file
     checked_out_by = Column(PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=True)  # User who has template checked out
     checked_out_at = Column(DateTime, nullable=True)  # When template was checked out
     status = Column(String, default=TemplateStatus.DRAFT.value, nullable=False)
@@ -147,8 +192,8 @@ class Template(Base):
 class Document(Base):
     __tablename__ = "documents"
 
-    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    project_id = Column(PostgresUUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(PostgresUUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, index=True)
     doc_type = Column(String, nullable=False)
     title = Column(String, nullable=False)
     current_version_id = Column(PostgresUUID(as_uuid=True), ForeignKey("document_versions.id"), nullable=True)
@@ -157,22 +202,25 @@ class Document(Base):
 
     project = relationship("Project")
     creator = relationship("User")
+    versions = relationship("DocumentVersion", foreign_keys="DocumentVersion.document_id", back_populates="document")
+    # Read-only: current_version_id is assigned directly, and documents <-> document_versions is a FK cycle
+    current_version = relationship("DocumentVersion", foreign_keys=[current_version_id], viewonly=True)
 
 
 class DocumentVersion(Base):
     __tablename__ = "document_versions"
 
-    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     document_id = Column(PostgresUUID(as_uuid=True), ForeignKey("documents.id"), nullable=False)
     version_string = Column(String, nullable=False)
     state = Column(String, default=DocumentState.DRAFT.value, nullable=False)
-    template_id = Column(PostgresUUID(as_uuid=True), ForeignKey("templates.id"), nullable=True)
+    template_id = Column(PostgresUUID(as_uuid=True), ForeignKey("templates.id"), nullable=True, index=True)
     content_json = Column(JSONB, nullable=True)
     pkb_snapshot_id = Column(PostgresUUID(as_uuid=True), ForeignKey("pkb_snapshots.id"), nullable=True)
     file_object_key = Column(String, nullable=True)
-    file_hash = Column(String, nullable=True)
+    file_hash = Column(Sha256Digest, nullable=True)
     pdf_object_key = Column(String, nullable=True)  # PDF version of the document
-    pdf_hash = Column(String, nullable=True)  # Hash of PDF file
+    pdf_hash = Column(Sha256Digest, nullable=True)  # Hash of PDF file
     checked_out_by = Column(PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=True)  # User who has document checked out
     checked_out_at = Column(DateTime, nullable=True)  # When document was checked out
     created_by = Column(PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -183,23 +231,25 @@ class DocumentVersion(Base):
     __table_args__ = (
         Index("ix_doc_version_document_state", "document_id", "state"),
         Index("ix_doc_version_document_version", "document_id", "version_string"),
+        Index("ix_doc_version_file_hash", "file_hash"),
     )
 
-    document = relationship("Document", foreign_keys=[document_id], backref="versions")
+    document = relationship("Document", foreign_keys=[document_id], back_populates="versions")
+    template = relationship("Template")
 
 
 class Approval(Base):
     __tablename__ = "approvals"
 
-    id = Column(Integer, primary_key=True, index=True)
-    document_version_id = Column(Integer, ForeignKey("document_versions.id"), nullable=False)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_version_id = Column(PostgresUUID(as_uuid=True), ForeignKey("document_versions.id"), nullable=False)
     step_no = Column(Integer, nullable=False)
     role_required = Column(String, ForeignKey("roles.role_code"), nullable=False)
-    approver_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    approver_user_id = Column(PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     status = Column(String, default=ApprovalStatus.PENDING.value, nullable=False)
     comment = Column(Text, nullable=True)
     signed_at = Column(DateTime, nullable=True)
-    evidence_hash = Column(String, nullable=True)
+    evidence_hash = Column(Sha256Digest, nullable=True)
 
     __table_args__ = (Index("ix_approval_doc_version", "document_version_id"),)
 
@@ -207,9 +257,9 @@ class Approval(Base):
 class ReviewComment(Base):
     __tablename__ = "review_comments"
 
-    id = Column(Integer, primary_key=True, index=True)
-    document_version_id = Column(Integer, ForeignKey("document_versions.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_version_id = Column(PostgresUUID(as_uuid=True), ForeignKey("document_versions.id"), nullable=False, index=True)
+    user_id = Column(PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     comment = Column(Text, nullable=False)
     created_at = Column(DateTime, default=utcnow, nullable=False)
 
@@ -217,37 +267,46 @@ class ReviewComment(Base):
 class Task(Base):
     __tablename__ = "tasks"
 
-    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    project_id = Column(PostgresUUID(as_uuid=True), ForeignKey("projects.id"), nullable=False)
-    task_type = Column(String, nullable=False)
-    title = Column(String, nullable=False)
-    description = Column(Text, nullable=True)
+    id: Mapped[uuid.UUID] = mapped_column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id: Mapped[uuid.UUID] = mapped_column(PostgresUUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"))
+    task_type: Mapped[str] = mapped_column(String)
+    title: Mapped[str] = mapped_column(String)
+    description: Mapped[Optional[str]] = mapped_column(Text)
     # RACI-related fields
-    raci_stage = Column(String, nullable=True)  # Stage from RACI matrix
-    raci_task_name = Column(String, nullable=True)  # Task name from RACI matrix
+    raci_stage: Mapped[Optional[str]] = mapped_column(String)  # Stage from RACI matrix
+    raci_task_name: Mapped[Optional[str]] = mapped_column(String)  # Task name from RACI matrix
     # Assignment and review
-    assigned_to_user_id = Column(PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
-    reviewer_id = Column(PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=True)  # Person who reviews/verifies
-    required_role = Column(String, nullable=True)
+    assigned_to_user_id: Mapped[Optional[uuid.UUID]] = mapped_column(PostgresUUID(as_uuid=True), ForeignKey("users.id"))
+    reviewer_id: Mapped[Optional[uuid.UUID]] = mapped_column(PostgresUUID(as_uuid=True), ForeignKey("users.id"))  # Person who reviews/verifies
+    required_role: Mapped[Optional[str]] = mapped_column(String)
     # Time tracking
-    estimated_time_hours = Column(Integer, nullable=True)  # Estimated time in hours
-    actual_time_hours = Column(Integer, nullable=True)  # Actual time spent
+    estimated_time_hours: Mapped[Optional[int]] = mapped_column(Integer)  # Estimated time in hours
+    actual_time_hours: Mapped[Optional[int]] = mapped_column(Integer)  # Actual time spent
     # Status and dates
-    status = Column(String, default=TaskStatus.OPEN.value, nullable=False)
-    priority = Column(String, default="NORMAL", nullable=False)
-    due_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=utcnow, nullable=False)
-    completed_at = Column(DateTime, nullable=True)
-    verified_at = Column(DateTime, nullable=True)
-    verified_by = Column(PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+    status: Mapped[str] = mapped_column(String, default=TaskStatus.OPEN.value)
+    priority: Mapped[str] = mapped_column(String, default="NORMAL")
+    due_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    verified_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    verified_by: Mapped[Optional[uuid.UUID]] = mapped_column(PostgresUUID(as_uuid=True), ForeignKey("users.id"))
     # Relations
-    related_document_version_id = Column(PostgresUUID(as_uuid=True), ForeignKey("document_versions.id"), nullable=True)
-    related_gate_id = Column(PostgresUUID(as_uuid=True), ForeignKey("gates.id"), nullable=True)
-    is_blocking = Column(Boolean, default=False, nullable=False)
+    related_document_version_id: Mapped[Optional[uuid.UUID]] = mapped_column(PostgresUUID(as_uuid=True), ForeignKey("document_versions.id"))
+    related_gate_id: Mapped[Optional[uuid.UUID]] = mapped_column(PostgresUUID(as_uuid=True), ForeignKey("gates.id"))
+    is_blocking: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    assigned_to: Mapped[Optional["User"]] = relationship("User", foreign_keys=[assigned_to_user_id])
+    reviewer: Mapped[Optional["User"]] = relationship("User", foreign_keys=[reviewer_id])
 
     __table_args__ = (
         Index("ix_task_project_status", "project_id", "status"),
-        Index("ix_task_assigned_status", "assigned_to_user_id", "status"),
+        # list_project_tasks stage/status filters
+        Index("ix_task_project_stage_status", "project_id", "raci_stage", "status"),
+        # RACI task lookups / duplicate detection (generate, fix-raci-tasks, review auto-trigger)
+        Index("ix_task_project_raci", "project_id", "raci_stage", "raci_task_name", "required_role"),
+        Index("ix_task_project_title", "project_id", "title"),
+        # /my-tasks: assignee + status filter, newest first (also covers assignee-only lookups)
+        Index("ix_task_assignee_status_created", "assigned_to_user_id", "status", created_at.desc()),
         Index("ix_task_due_at", "due_at"),
         Index("ix_task_is_blocking", "is_blocking"),
     )
@@ -256,8 +315,8 @@ class Task(Base):
 class Reminder(Base):
     __tablename__ = "reminders"
 
-    id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    task_id = Column(PostgresUUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False, index=True)
     rule_code = Column(String, nullable=False)
     next_run_at = Column(DateTime, nullable=False)
     last_sent_at = Column(DateTime, nullable=True)
@@ -272,11 +331,11 @@ class Reminder(Base):
 class Escalation(Base):
     __tablename__ = "escalations"
 
-    id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    task_id = Column(PostgresUUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False, index=True)
     level = Column(Integer, nullable=False)
     escalated_to_role = Column(String, ForeignKey("roles.role_code"), nullable=False)
-    escalated_to_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    escalated_to_user_id = Column(PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     triggered_at = Column(DateTime, default=utcnow, nullable=False)
     reason = Column(Text, nullable=True)
 
@@ -284,8 +343,8 @@ class Escalation(Base):
 class Gate(Base):
     __tablename__ = "gates"
 
-    id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(PostgresUUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, index=True)
     gate_type = Column(String, nullable=False)
     title = Column(String, nullable=False)
     status = Column(String, default=GateStatus.OPEN.value, nullable=False)
@@ -299,15 +358,15 @@ class Gate(Base):
 class GanttItem(Base):
     __tablename__ = "gantt_items"
 
-    id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(PostgresUUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, index=True)
     item_type = Column(String, nullable=False)
     title = Column(String, nullable=False)
     owner_role = Column(String, ForeignKey("roles.role_code"), nullable=True)
-    related_task_id = Column(Integer, ForeignKey("tasks.id"), nullable=True)
-    related_document_id = Column(Integer, ForeignKey("documents.id"), nullable=True)
-    related_document_version_id = Column(Integer, ForeignKey("document_versions.id"), nullable=True)
-    related_gate_id = Column(Integer, ForeignKey("gates.id"), nullable=True)
+    related_task_id = Column(PostgresUUID(as_uuid=True), ForeignKey("tasks.id"), nullable=True)
+    related_document_id = Column(PostgresUUID(as_uuid=True), ForeignKey("documents.id"), nullable=True)
+    related_document_version_id = Column(PostgresUUID(as_uuid=True), ForeignKey("document_versions.id"), nullable=True)
+    related_gate_id = Column(PostgresUUID(as_uuid=True), ForeignKey("gates.id"), nullable=True)
     start_planned = Column(Date, nullable=True)
     end_planned = Column(Date, nullable=True)
     start_actual = Column(DateTime, nullable=True)
@@ -320,46 +379,46 @@ class GanttItem(Base):
 class Evidence(Base):
     __tablename__ = "evidence"
 
-    id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(PostgresUUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, index=True)
     evidence_type = Column(String, nullable=False)
     title = Column(String, nullable=False)
     object_key = Column(String, nullable=False)
-    file_hash = Column(String, nullable=False)
+    file_hash = Column(Sha256Digest, nullable=False)
     linked_to_type = Column(String, nullable=False)
-    linked_to_id = Column(Integer, nullable=False)
-    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    linked_to_id = Column(PostgresUUID(as_uuid=True), nullable=False)
+    created_by = Column(PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=utcnow, nullable=False)
 
 
 class PKBSnapshot(Base):
     __tablename__ = "pkb_snapshots"
 
-    id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(PostgresUUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, index=True)
     version_string = Column(String, nullable=False)
     source_files_json = Column(JSONB, nullable=True)
     extracted_json = Column(JSONB, nullable=True)
-    hash = Column(String, nullable=True)
+    hash = Column(Sha256Digest, nullable=True)
     created_at = Column(DateTime, default=utcnow, nullable=False)
-    confirmed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    confirmed_by = Column(PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     confirmed_at = Column(DateTime, nullable=True)
 
 
 class AIRun(Base):
     __tablename__ = "ai_runs"
 
-    id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(PostgresUUID(as_uuid=True), ForeignKey("projects.id"), nullable=False, index=True)
     run_type = Column(String, nullable=False)
     model = Column(String, nullable=False)
     temperature = Column(String, nullable=False)
     prompt_version = Column(String, nullable=True)
-    input_hash = Column(String, nullable=False)
-    output_hash = Column(String, nullable=False)
+    input_hash = Column(Sha256Digest, nullable=False)
+    output_hash = Column(Sha256Digest, nullable=False)
     related_entity_type = Column(String, nullable=True)
-    related_entity_id = Column(Integer, nullable=True)
-    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    related_entity_id = Column(PostgresUUID(as_uuid=True), nullable=True)
+    created_by = Column(PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=utcnow, nullable=False)
     raw_request_json = Column(JSONB, nullable=True)
     raw_response_json = Column(JSONB, nullable=True)
@@ -368,25 +427,27 @@ class AIRun(Base):
 class AuditLog(Base):
     __tablename__ = "audit_log"
 
-    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    org_id = Column(PostgresUUID(as_uuid=True), ForeignKey("orgs.id"), nullable=True)
-    project_id = Column(PostgresUUID(as_uuid=True), ForeignKey("projects.id"), nullable=True)
-    actor_user_id = Column(PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    action = Column(String, nullable=False)
-    entity_type = Column(String, nullable=False)
-    entity_id = Column(PostgresUUID(as_uuid=True), nullable=False)
-    before_json = Column(JSONB, nullable=True)
-    after_json = Column(JSONB, nullable=True)
-    created_at = Column(DateTime, default=utcnow, nullable=False)
-    ip = Column(String, nullable=True)
-    user_agent = Column(String, nullable=True)
+    id: Mapped[uuid.UUID] = mapped_column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    org_id: Mapped[Optional[uuid.UUID]] = mapped_column(PostgresUUID(as_uuid=True), ForeignKey("orgs.id"))
+    project_id: Mapped[Optional[uuid.UUID]] = mapped_column(PostgresUUID(as_uuid=True), ForeignKey("projects.id"))
+    actor_user_id: Mapped[uuid.UUID] = mapped_column(PostgresUUID(as_uuid=True), ForeignKey("users.id"))
+    action: Mapped[str] = mapped_column(String)
+    entity_type: Mapped[str] = mapped_column(String)
+    entity_id: Mapped[uuid.UUID] = mapped_column(PostgresUUID(as_uuid=True))
+    before_json: Mapped[Optional[dict[str, Any]]] = mapped_column(JSONB)
+    after_json: Mapped[Optional[dict[str, Any]]] = mapped_column(JSONB)
+    # Part of the primary key because audit_log is range-partitioned by created_at
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, primary_key=True)
+    ip: Mapped[Optional[str]] = mapped_column(String)
+    user_agent: Mapped[Optional[str]] = mapped_column(String)
 
     # Relationships
-    actor = relationship("User", foreign_keys=[actor_user_id], backref="audit_logs")
+    actor: Mapped["User"] = relationship("User", foreign_keys=[actor_user_id], back_populates="audit_logs")
 
     __table_args__ = (
         Index("ix_audit_project_created", "project_id", "created_at"),
         Index("ix_audit_actor_created", "actor_user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
 
@@ -394,7 +455,7 @@ class DocumentType(Base):
     """Document type definitions for templates."""
     __tablename__ = "document_types"
 
-    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     org_id = Column(PostgresUUID(as_uuid=True), ForeignKey("orgs.id"), nullable=True)  # NULL = global/system type
     code = Column(String, nullable=False, unique=True, index=True)  # e.g., "PDD", "SDD", "TEST_PLAN"
     name = Column(String, nullable=False)  # Display name, e.g., "Product Design Document"
@@ -409,5 +470,7 @@ class DocumentType(Base):
 
     __table_args__ = (
         Index("ix_document_type_org_code", "org_id", "code"),
+        # Case-insensitive code lookups (create_document_type duplicate check)
+        Index("ix_document_type_code_lower", func.lower(code), unique=True),
     )
 
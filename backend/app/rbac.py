@@ -1,31 +1,119 @@
+from datetime import datetime, timezone
+import json
+import logging
 from typing import List, Optional
+from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.dependencies import get_current_active_user
 from app.db import get_db
 from app.models import ProjectMember, User
 from app.core.enums import RoleCode
+from app.services.cache import cache_get, cache_set, cache_delete, cache_delete_async, cache_is_shared
+from app.services.membership import invalidate_user_org_ids, invalidate_user_org_ids_async
+from app.services.project_cache import (
+    invalidate_my_projects,
+    invalidate_my_projects_async,
+    invalidate_raci,
+    invalidate_raci_async,
+    invalidate_team_members,
+    invalidate_team_members_async,
+)
+
+logger = logging.getLogger(__name__)
+
+# Also the longest a revoked role can still be served if the Redis delete in
+# invalidate_membership_cache fails, so keep it short
+MEMBERSHIP_CACHE_TTL = 15  # seconds
+
+
+def _membership_cache_key(project_id, user_id) -> str:
+    # Canonical UUID text, so a str ID (e.g. uppercase) and a UUID object share one entry
+    return f"pm:{UUID(str(project_id))}:{UUID(str(user_id))}"
+
+
+def invalidate_membership_cache(project_id, user_id) -> None:
+    """Drop cached membership (and the user's cached org IDs, project list and the project's RACI team) after ProjectMember is created/updated/deleted."""
+    if not cache_delete(_membership_cache_key(project_id, user_id)):
+        _log_stale_membership(project_id, user_id)
+    invalidate_user_org_ids(user_id)
+    invalidate_my_projects(user_id)
+    invalidate_raci(project_id)
+    invalidate_team_members(project_id)
+
+
+async def invalidate_membership_cache_async(project_id, user_id) -> None:
+    """invalidate_membership_cache for async routes (doesn't block the event loop on Redis)."""
+    if not await cache_delete_async(_membership_cache_key(project_id, user_id)):
+        _log_stale_membership(project_id, user_id)
+    await invalidate_user_org_ids_async(user_id)
+    await invalidate_my_projects_async(user_id)
+    await invalidate_raci_async(project_id)
+    await invalidate_team_members_async(project_id)
+
+
+def _log_stale_membership(project_id, user_id) -> None:
+    logger.error(
+        f"Could not invalidate cached membership of user {user_id} in project {project_id}; "
+        f"the old role may be served for up to {MEMBERSHIP_CACHE_TTL}s"
+    )
+
+
+def _get_membership_role(db: Session, project_id, user_id) -> Optional[str]:
+    """
+    Get member's role_code for project, using the cache before hitting the DB.
+    The cache is only used when it is shared (Redis): the per-worker fallback
+    can't be invalidated across workers, so a revoke could be missed.
+    """
+    key = _membership_cache_key(project_id, user_id)
+    use_cache = cache_is_shared()
+    cached = cache_get(key) if use_cache else None
+    if cached is not None:
+        data = json.loads(cached)
+        expires_at = data["expires_at"]
+    else:
+        # Select only the covered columns so the lookup stays an index-only scan
+        membership = db.execute(
+            select(ProjectMember.role_code, ProjectMember.expires_at).where(
+                ProjectMember.project_id == project_id, ProjectMember.user_id == user_id
+            )
+        ).first()
+        if not membership:
+            return None
+        data = {
+            "role_code": membership.role_code,
+            "expires_at": membership.expires_at.isoformat() if membership.expires_at else None,
+        }
+        expires_at = data["expires_at"]
+        if use_cache:
+            cache_set(key, json.dumps(data), ttl=MEMBERSHIP_CACHE_TTL)
+    # Expired (disabled) memberships don't grant access
+    if expires_at:
+        expires_dt = datetime.fromisoformat(expires_at)
+        if expires_dt.tzinfo is None:
+            expires_dt = expires_dt.replace(tzinfo=timezone.utc)
+        if expires_dt <= datetime.now(timezone.utc):
+            return None
+    return data["role_code"]
 
 
 def require_project_role(
     allowed_roles: List[RoleCode], project_id_param: str = "project_id"
 ):
+    allowed = frozenset(r.value for r in allowed_roles)
+
     def dependency(
         user: User = Depends(get_current_active_user), db: Session = Depends(get_db), **kwargs
     ) -> User:
         project_id = kwargs.get(project_id_param)
         if project_id is None:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project required")
-        membership = (
-            db.query(ProjectMember)
-            .filter(ProjectMember.project_id == project_id, ProjectMember.user_id == user.id)
-            .first()
-        )
-        if membership and membership.role_code in [r.value for r in allowed_roles]:
+        role_code = _get_membership_role(db, project_id, user.id)
+        if role_code and role_code in allowed:
             return user
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
     return dependency
-
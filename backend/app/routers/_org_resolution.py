@@ -0,0 +1,57 @@
+"""
+Resolve which organization a user's org-scoped records (e.g. folders) belong to.
+"""
+import uuid
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Org, Project, ProjectMember, User
+
+# Default org (first Org row) is resolved once per process - it's only ever created, never changed
+_DEFAULT_ORG_ID: Optional[UUID] = None
+
+
+def get_default_org_id(db: Session, create: bool = False) -> Optional[UUID]:
+    """Get the default org's ID (cached after first lookup), optionally creating the org if none exists."""
+    global _DEFAULT_ORG_ID
+    if _DEFAULT_ORG_ID is None:
+        default_org = db.query(Org.id).first()
+        if default_org:
+            _DEFAULT_ORG_ID = default_org.id
+        elif create:
+            org = Org(id=uuid.uuid4(), name="Default Organization")
+            db.add(org)
+            db.commit()
+            _DEFAULT_ORG_ID = org.id
+    return _DEFAULT_ORG_ID
+
+
+async def get_default_org_id_async(db: AsyncSession, create: bool = False) -> Optional[UUID]:
+    """AsyncSession variant of get_default_org_id, sharing the same process-wide cache."""
+    global _DEFAULT_ORG_ID
+    if _DEFAULT_ORG_ID is None:
+        org_id = await db.scalar(select(Org.id).limit(1))
+        if org_id is None and create:
+            org_id = await db.scalar(
+                insert(Org).values(id=uuid.uuid4(), name="Default Organization").returning(Org.id)
+            )
+            await db.commit()
+        _DEFAULT_ORG_ID = org_id
+    return _DEFAULT_ORG_ID
+
+
+def resolve_user_org_id(db: Session, user: User, create_default: bool = False) -> Optional[UUID]:
+    """
+    Org of the first project the user is a member of (one JOINed query).
+    Falls back to the default org when the user has no memberships.
+    """
+    org_id = db.query(Project.org_id).join(
+        ProjectMember, ProjectMember.project_id == Project.id
+    ).filter(ProjectMember.user_id == user.id).limit(1).scalar()
+    if org_id is not None:
+        return org_id
+    return get_default_org_id(db, create=create_default)
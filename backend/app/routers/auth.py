@@ -1,11 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
-import traceback
 import logging
 
 from app.db import get_db
 from app.schemas import LoginRequest, Token, UserRead
-from app.security import verify_password, get_password_hash, create_access_token
+from app.security import (
+    verify_password,
+    get_password_hash,
+    password_needs_rehash,
+    create_access_token,
+    DUMMY_PASSWORD_HASH,
+)
 from app.dependencies import get_current_active_user
 from app.models import User
 
@@ -16,42 +23,54 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/login", response_model=Token)
 def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    import logging
-    logger = logging.getLogger(__name__)
     logger.info(f"Login request received: email={payload.email}, has_password={bool(payload.password)}")
-    print(f"LOGIN REQUEST: email={payload.email}, has_password={bool(payload.password)}")
     try:
-        user = db.query(User).filter(User.email == payload.email).first()
+        user = db.query(User).filter(func.lower(User.email) == payload.email.lower()).first()
         logger.info(f"User found: {user is not None}")
-        print(f"User found: {user is not None}")
         if user:
             if not user.is_active:
+                # Same cost as a real check so inactive accounts can't be told apart by timing
+                verify_password(payload.password or "", DUMMY_PASSWORD_HASH)
                 raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User account is inactive")
             if user.password_hash and payload.password:
                 if not verify_password(payload.password, user.password_hash):
                     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+                # Upgrade legacy bcrypt hashes to argon2id now that we have the plaintext
+                if password_needs_rehash(user.password_hash):
+                    user.password_hash = get_password_hash(payload.password)
+            else:
+                verify_password(payload.password or "", DUMMY_PASSWORD_HASH)
         else:
-            # Create new user - password will be hashed in get_password_hash
-            password_to_hash = payload.password or "changeme"
-            password_bytes = password_to_hash.encode('utf-8')
-            if len(password_bytes) > 72:
-                password_to_hash = password_bytes[:72].decode('utf-8', errors='ignore')
-            
-            user = User(
-                email=payload.email,
-                name=payload.name or payload.email.split("@")[0],
-                password_hash=get_password_hash(password_to_hash),
-                is_active=True,
-                auth_provider="local",
+            # Create new user in a single INSERT ... RETURNING round trip.
+            # ON CONFLICT covers a concurrent login creating the same email in between,
+            # in which case the existing row comes back unchanged.
+            password_hash = get_password_hash(payload.password or "changeme")
+            stmt = (
+                pg_insert(User)
+                .values(
+                    email=payload.email,
+                    name=payload.name or payload.email.split("@")[0],
+                    password_hash=password_hash,
+                    is_active=True,
+                    auth_provider="local",
+                )
+                .on_conflict_do_update(
+                    index_elements=[func.lower(User.email)],
+                    set_={"email": User.email},
+                )
+                .returning(User)
             )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-        token = create_access_token(user.email)
-        # Return user data in response for frontend using from_attributes
+            user = db.scalars(stmt).one()
+            if user.password_hash != password_hash:
+                if not user.is_active:
+                    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User account is inactive")
+                if user.password_hash and payload.password and not verify_password(payload.password, user.password_hash):
+                    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        # Read everything needed for the response before commit expires the instance
         user_data = UserRead.model_validate(user)
-        logger.info(f"Login successful for user: {user.email}")
-        print(f"LOGIN SUCCESS: user={user.email}")
+        db.commit()
+        token = create_access_token(user_data.email)
+        logger.info(f"Login successful for user: {user_data.email}")
         return Token(access_token=token, user=user_data)
     except HTTPException:
         # Re-raise HTTP exceptions (like 401 Unauthorized) without modification
@@ -59,9 +78,7 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
         raise
     except Exception as e:
         db.rollback()
-        logger.error(f"Login failed: {str(e)}", exc_info=True)
-        print(f"LOGIN ERROR: {str(e)}")
-        traceback.print_exc()
+        logger.exception(f"Login failed: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Login failed: {str(e)}"
@@ -2,19 +2,44 @@
 Document Types API endpoints.
 Allows creating and managing document types for templates.
 """
+from datetime import datetime
+import hashlib
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, func
 
 from app.db import get_db
 from app.dependencies import get_current_active_user
-from app.models import DocumentType, User
+from app.models import DocumentType, Org, User
 from app.schemas import DocumentTypeCreate, DocumentTypeRead, DocumentTypeUpdate
-from app.services.audit import log_action, AuditAction
+from app.services.audit import log_action_async, AuditAction
+from app.services.membership import get_user_org_ids
 
 router = APIRouter(prefix="/document-types", tags=["document-types"])
 
+VALID_FILE_EXTENSIONS = ("docx", "xlsx", "pptx")
+_INVALID_EXTENSION_DETAIL = f"Invalid file extension. Must be one of: {', '.join(VALID_FILE_EXTENSIONS)}"
+
+
+def _get_accessible_document_type(db: Session, doc_type_id: str, user_id) -> DocumentType:
+    """
+    Load a document type and check access.
+    Access: global types (org_id=None) or types of an org the user belongs to (cached org IDs).
+    """
+    try:
+        doc_type_uuid = UUID(doc_type_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid document type ID format")
+
+    doc_type = db.get(DocumentType, doc_type_uuid)
+    if not doc_type:
+        raise HTTPException(status_code=404, detail="Document type not found")
+    if doc_type.org_id is not None and doc_type.org_id not in get_user_org_ids(db, user_id):
+        raise HTTPException(status_code=403, detail="Access denied")
+    return doc_type
+
 
 @router.post("", response_model=DocumentTypeRead, status_code=status.HTTP_201_CREATED)
 def create_document_type(
@@ -29,7 +54,7 @@ def create_document_type(
     """
     # Check if code already exists (case-insensitive)
     existing = db.query(DocumentType).filter(
-        DocumentType.code.ilike(payload.code)
+        func.lower(DocumentType.code) == payload.code.lower()
     ).first()
     
     if existing:
@@ -39,30 +64,19 @@ def create_document_type(
         )
     
     # Validate file extension
-    valid_extensions = ['docx', 'xlsx', 'pptx']
-    if payload.default_file_extension not in valid_extensions:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file extension. Must be one of: {', '.join(valid_extensions)}"
-        )
+    if payload.default_file_extension not in VALID_FILE_EXTENSIONS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=_INVALID_EXTENSION_DETAIL)
     
     # Get user's organization ID from their projects
     org_id = None
     if payload.org_specific:
         # Get user's org from their project memberships
-        from app.models import ProjectMember, Project
-        user_project = db.query(Project).join(
-            ProjectMember, Project.id == ProjectMember.project_id
-        ).filter(
-            ProjectMember.user_id == current_user.id,
-            (ProjectMember.expires_at.is_(None) | (ProjectMember.expires_at > func.now()))
-        ).first()
+        user_org_ids = get_user_org_ids(db, current_user.id)
         
-        if user_project:
-            org_id = user_project.org_id
+        if user_org_ids:
+            org_id = user_org_ids[0]
         else:
             # Fallback: use default org if user has no projects
-            from app.models import Org
             default_org = db.query(Org).first()
             if default_org:
                 org_id = default_org.id
@@ -86,55 +100,33 @@ def create_document_type(
     db.add(doc_type)
     db.commit()  # Commit immediately to ensure doc_type is persisted
     
-    # Extract all values after commit to avoid session issues
-    doc_type_id_value = doc_type.id
-    doc_type_org_id_value = doc_type.org_id
-    doc_type_code_value = doc_type.code
-    doc_type_name_value = doc_type.name
-    doc_type_description_value = doc_type.description
-    doc_type_ext_value = doc_type.default_file_extension
-    
-    # Audit log - in separate try/except so it doesn't affect doc_type creation
-    try:
-        client_ip = request.client.host if request.client else None
-        user_agent = request.headers.get("user-agent")
-        
-        log_action(
-            db,
-            actor_user_id=current_user.id,
-            action=AuditAction.TEMPLATE_CREATE,  # Reusing action type
-            entity_type="DocumentType",
-            entity_id=doc_type_id_value,
-            org_id=doc_type_org_id_value,
-            after_json={
-                "code": doc_type_code_value,
-                "name": doc_type_name_value,
-                "description": doc_type_description_value,
-                "default_file_extension": doc_type_ext_value,
-                "org_id": str(doc_type_org_id_value) if doc_type_org_id_value else None
-            },
-            ip=client_ip,
-            user_agent=user_agent,
-        )
-        db.commit()  # Commit audit log
-    except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.warning(f"Audit logging failed: {str(e)}")
-        # Don't fail the whole request if audit logging fails
-        try:
-            db.rollback()
-        except:
-            pass
-    
-    # Refresh the object to ensure it's fully loaded from database
-    db.refresh(doc_type)
+    # Audit log - queued for the background writer so it doesn't affect doc_type creation
+    client_ip = request.client.host if request.client else None
+    user_agent = request.headers.get("user-agent")
+    log_action_async(
+        actor_user_id=current_user.id,
+        action=AuditAction.TEMPLATE_CREATE,  # Reusing action type
+        entity_type="DocumentType",
+        entity_id=doc_type.id,
+        org_id=org_id,
+        after_json={
+            "code": doc_type.code,
+            "name": doc_type.name,
+            "description": doc_type.description,
+            "default_file_extension": doc_type.default_file_extension,
+            "org_id": str(org_id) if org_id else None
+        },
+        ip=client_ip,
+        user_agent=user_agent,
+    )
     
     return doc_type
 
 
 @router.get("", response_model=List[DocumentTypeRead])
 def list_document_types(
+    request: Request,
+    response: Response,
     include_inactive: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -142,30 +134,26 @@ def list_document_types(
     """
     List all document types.
     Returns global types (org_id=None) and types specific to user's organization.
+    Supports If-None-Match: a 304 is answered from MAX(updated_at)/COUNT without loading the rows.
     """
-    # Get user's organization IDs from their project memberships
-    from app.models import ProjectMember, Project
-    user_orgs = db.query(Project.org_id).join(
-        ProjectMember, Project.id == ProjectMember.project_id
-    ).filter(
-        ProjectMember.user_id == current_user.id,
-        (ProjectMember.expires_at.is_(None) | (ProjectMember.expires_at > func.now()))
-    ).distinct().all()
-    user_org_ids = [org_id[0] for org_id in user_orgs] if user_orgs else []
-    
-    # Always include global types (org_id=None)
-    # Also include organization-specific types if user belongs to those orgs
-    filters = [DocumentType.org_id.is_(None)]  # Always include global types
-    
-    if user_org_ids:
-        filters.append(DocumentType.org_id.in_(user_org_ids))
-    
-    query = db.query(DocumentType).filter(or_(*filters))
-    
+    # Global types (org_id=None) plus types of orgs the user belongs to
+    filters = [or_(
+        DocumentType.org_id.is_(None),
+        DocumentType.org_id.in_(get_user_org_ids(db, current_user.id)),
+    )]
     if not include_inactive:
-        query = query.filter(DocumentType.is_active == True)
-    
-    doc_types = query.order_by(DocumentType.name).all()
+        filters.append(DocumentType.is_active == True)
+    
+    # Every create/update/soft delete bumps updated_at, so (max, count) changes whenever the list does
+    last_updated, total = db.query(func.max(DocumentType.updated_at), func.count(DocumentType.id)).filter(*filters).one()
+    etag_source = f"{current_user.id}-{include_inactive}-{last_updated}-{total}"
+    etag = f'"{hashlib.blake2b(etag_source.encode(), digest_size=16).hexdigest()}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+    
+    response.headers.update(cache_headers)
+    doc_types = db.query(DocumentType).filter(*filters).order_by(DocumentType.name).all()
     return doc_types
 
 
@@ -176,33 +164,7 @@ def get_document_type(
     current_user: User = Depends(get_current_active_user)
 ):
     """Get a specific document type by ID."""
-    from uuid import UUID
-    
-    try:
-        doc_type_uuid = UUID(doc_type_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid document type ID format")
-    
-    doc_type = db.query(DocumentType).filter(DocumentType.id == doc_type_uuid).first()
-    
-    if not doc_type:
-        raise HTTPException(status_code=404, detail="Document type not found")
-    
-    # Check access: must be global or belong to user's org
-    if doc_type.org_id:
-        from app.models import ProjectMember, Project
-        user_orgs = db.query(Project.org_id).join(
-            ProjectMember, Project.id == ProjectMember.project_id
-        ).filter(
-            ProjectMember.user_id == current_user.id,
-            (ProjectMember.expires_at.is_(None) | (ProjectMember.expires_at > func.now()))
-        ).distinct().all()
-        user_org_ids = [org_id[0] for org_id in user_orgs] if user_orgs else []
-        
-        if doc_type.org_id not in user_org_ids:
-            raise HTTPException(status_code=403, detail="Access denied")
-    
-    return doc_type
+    return _get_accessible_document_type(db, doc_type_id, current_user.id)
 
 
 @router.put("/{doc_type_id}", response_model=DocumentTypeRead)
@@ -214,45 +176,16 @@ def update_document_type(
     current_user: User = Depends(get_current_active_user)
 ):
     """Update a document type."""
-    from uuid import UUID
-    from datetime import datetime
-    
-    try:
-        doc_type_uuid = UUID(doc_type_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid document type ID format")
-    
-    doc_type = db.query(DocumentType).filter(DocumentType.id == doc_type_uuid).first()
-    
-    if not doc_type:
-        raise HTTPException(status_code=404, detail="Document type not found")
-    
-    # Check access
-    if doc_type.org_id:
-        from app.models import ProjectMember, Project
-        user_orgs = db.query(Project.org_id).join(
-            ProjectMember, Project.id == ProjectMember.project_id
-        ).filter(
-            ProjectMember.user_id == current_user.id,
-            (ProjectMember.expires_at.is_(None) | (ProjectMember.expires_at > func.now()))
-        ).distinct().all()
-        user_org_ids = [org_id[0] for org_id in user_orgs] if user_orgs else []
-        
-        if doc_type.org_id not in user_org_ids:
-            raise HTTPException(status_code=403, detail="Access denied")
-    
+    doc_type = _get_accessible_document_type(db, doc_type_id, current_user.id)
+
     # Update fields
     if payload.name is not None:
         doc_type.name = payload.name
     if payload.description is not None:
         doc_type.description = payload.description
     if payload.default_file_extension is not None:
-        valid_extensions = ['docx', 'xlsx', 'pptx']
-        if payload.default_file_extension not in valid_extensions:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid file extension. Must be one of: {', '.join(valid_extensions)}"
-            )
+        if payload.default_file_extension not in VALID_FILE_EXTENSIONS:
+            raise HTTPException(status_code=400, detail=_INVALID_EXTENSION_DETAIL)
         doc_type.default_file_extension = payload.default_file_extension
     if payload.is_active is not None:
         doc_type.is_active = payload.is_active
@@ -260,7 +193,6 @@ def update_document_type(
     doc_type.updated_at = datetime.utcnow()
     
     db.commit()
-    db.refresh(doc_type)
     
     return doc_type
 
@@ -272,32 +204,8 @@ def delete_document_type(
     current_user: User = Depends(get_current_active_user)
 ):
     """Delete a document type (soft delete by setting is_active=False)."""
-    from uuid import UUID
-    
-    try:
-        doc_type_uuid = UUID(doc_type_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid document type ID format")
-    
-    doc_type = db.query(DocumentType).filter(DocumentType.id == doc_type_uuid).first()
-    
-    if not doc_type:
-        raise HTTPException(status_code=404, detail="Document type not found")
-    
-    # Check access
-    if doc_type.org_id:
-        from app.models import ProjectMember, Project
-        user_orgs = db.query(Project.org_id).join(
-            ProjectMember, Project.id == ProjectMember.project_id
-        ).filter(
-            ProjectMember.user_id == current_user.id,
-            (ProjectMember.expires_at.is_(None) | (ProjectMember.expires_at > func.now()))
-        ).distinct().all()
-        user_org_ids = [org_id[0] for org_id in user_orgs] if user_orgs else []
-        
-        if doc_type.org_id not in user_org_ids:
-            raise HTTPException(status_code=403, detail="Access denied")
-    
+    doc_type = _get_accessible_document_type(db, doc_type_id, current_user.id)
+
     # Soft delete
     doc_type.is_active = False
     db.commit()
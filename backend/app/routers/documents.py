@@ -1,40 +1,80 @@
 from datetime import datetime
+from typing import Optional
+import uuid
+from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
 
-from app.db import get_db
+from app.db import get_async_db
 from app.dependencies import get_current_active_user
 from app.schemas import (
     DocumentCreate,
     DocumentRead,
     DocumentVersionCreate,
+    DocumentVersionListItem,
     DocumentVersionRead,
 )
-from app.models import Document, DocumentVersion, Project, ProjectMember
+from app.models import Document, DocumentVersion, Project, ProjectMember, Template
 from app.core.enums import DocumentState
 
 router = APIRouter(tags=["documents"])
 
+# Template columns embedded in version responses (skips the heavy mapping manifest)
+_VERSION_TEMPLATE_COLUMNS = (Template.doc_type, Template.name, Template.object_key, Template.file_hash)
+# Version columns returned by list_versions (DocumentVersionListItem)
+_VERSION_LIST_COLUMNS = (
+    DocumentVersion.document_id,
+    DocumentVersion.version_string,
+    DocumentVersion.state,
+    DocumentVersion.template_id,
+    DocumentVersion.pkb_snapshot_id,
+    DocumentVersion.file_object_key,
+    DocumentVersion.file_hash,
+    DocumentVersion.created_by,
+    DocumentVersion.created_at,
+    DocumentVersion.submitted_at,
+    DocumentVersion.locked_at,
+)
+
+
+def _active_membership(project_id_column, user_id):
+    """Join condition for the user's non-expired ProjectMember row on a project."""
+    return and_(
+        ProjectMember.project_id == project_id_column,
+        ProjectMember.user_id == user_id,
+        (ProjectMember.expires_at.is_(None) | (ProjectMember.expires_at > datetime.utcnow())),
+    )
+
+
+async def _get_version_with_template(db: AsyncSession, version_id) -> Optional[DocumentVersion]:
+    """Load a version with its template for DocumentVersionRead (also reloads it after a commit)."""
+    return await db.scalar(
+        select(DocumentVersion)
+        .options(joinedload(DocumentVersion.template).load_only(*_VERSION_TEMPLATE_COLUMNS))
+        .where(DocumentVersion.id == version_id)
+        .execution_options(populate_existing=True)
+    )
+
 
 @router.get("/projects/{project_id}/documents", response_model=list[DocumentRead])
-def list_documents(
-    project_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_active_user)
+async def list_documents(
+    project_id: UUID, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_active_user)
 ):
-    from uuid import UUID
-    try:
-        project_uuid = UUID(project_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid project ID format")
-    # Load documents with current_version using join
-    documents = db.query(Document).filter(Document.project_id == project_uuid).all()
-    # Get current_version for each document
+    # current_version is fetched with one extra IN query (state only) instead of one query per document
+    # raiseload: anything else the loop touches must not lazy-load
+    documents = (await db.scalars(
+        select(Document)
+        .options(
+            selectinload(Document.current_version).load_only(DocumentVersion.state),
+            raiseload("*"),
+        )
+        .where(Document.project_id == project_id)
+    )).all()
     result = []
     for doc in documents:
-        current_version_state = None
-        if doc.current_version_id:
-            current_version = db.query(DocumentVersion).filter(DocumentVersion.id == doc.current_version_id).first()
-            if current_version:
-                current_version_state = current_version.state
+        current_version_state = doc.current_version.state if doc.current_version else None
         doc_dict = {
             "id": doc.id,
             "project_id": doc.project_id,
@@ -50,64 +90,57 @@ def list_documents(
 
 
 @router.post("/projects/{project_id}/documents", response_model=DocumentRead, status_code=status.HTTP_201_CREATED)
-def create_document(
+async def create_document(
     request: Request,
-    project_id: str,
+    project_id: UUID,
     payload: DocumentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user),
 ):
-    from uuid import UUID
-    try:
-        project_uuid = UUID(project_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid project ID format")
-    
-    if payload.project_id != project_uuid:
+    if payload.project_id != project_id:
         raise HTTPException(status_code=400, detail="Project mismatch")
     
-    # HIPAA/GxP/GIS Compliance: Verify user has access to project
-    project = db.query(Project).filter(Project.id == project_uuid).first()
+    # HIPAA/GxP/GIS Compliance: Verify project exists and user is a member, in one round trip
+    project = (await db.execute(
+        select(Project.org_id, ProjectMember.user_id.label("member_user_id"))
+        .outerjoin(ProjectMember, _active_membership(Project.id, current_user.id))
+        .where(Project.id == project_id)
+    )).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Check if user is a member of the project
-    member = db.query(ProjectMember).filter(
-        ProjectMember.project_id == project_uuid,
-        ProjectMember.user_id == current_user.id,
-        (ProjectMember.expires_at.is_(None) | (ProjectMember.expires_at > datetime.utcnow()))
-    ).first()
-    
-    if not member:
+    if project.member_user_id is None:
         raise HTTPException(
             status_code=403, 
             detail="Access denied: You must be a member of this project to create documents"
         )
     
-    document = Document(
-        project_id=project_uuid,
-        doc_type=payload.doc_type,
-        title=payload.title,
-        created_by=current_user.id,
-    )
-    db.add(document)
-    db.flush()  # Flush to get document.id
-    
-    # Automatically create version 1.0
-    version = DocumentVersion(
-        document_id=document.id,
+    # Document + version 1.0 in one statement: the version INSERT rides along as a CTE, so the
+    # document can point at it from the start (FK checks run at the end of the statement).
+    # IDs/timestamps are passed explicitly - Core doesn't apply column defaults inside the CTE.
+    document_id = uuid.uuid4()
+    version_id = uuid.uuid4()
+    created_at = datetime.utcnow()
+    initial_version = insert(DocumentVersion).values(
+        id=version_id,
+        document_id=document_id,
         version_string="1.0",
         state=DocumentState.DRAFT.value,
-        template_id=None,
         content_json={},
-        pkb_snapshot_id=None,
         created_by=current_user.id,
+        created_at=created_at,
+    ).cte("initial_version")
+    document = await db.scalar(
+        insert(Document).add_cte(initial_version).values(
+            id=document_id,
+            project_id=project_id,
+            doc_type=payload.doc_type,
+            title=payload.title,
+            current_version_id=version_id,
+            created_by=current_user.id,
+            created_at=created_at,
+        ).returning(Document)
     )
-    db.add(version)
-    db.flush()  # Flush to get version.id
-    
-    # Set as current version
-    document.current_version_id = version.id
     
     # HIPAA/GxP/GIS Compliance: Audit log for document creation
     try:
@@ -117,14 +150,15 @@ def create_document(
         client_ip = request.client.host if request.client else None
         user_agent = request.headers.get("user-agent")
         
-        log_action(
-            db,
+        # log_action takes a sync Session; run_sync keeps it in this transaction
+        await db.run_sync(lambda sync_db: log_action(
+            sync_db,
             actor_user_id=current_user.id,
             action=AuditAction.DOCUMENT_CREATE,
             entity_type="Document",
             entity_id=document.id,
             org_id=project.org_id,
-            project_id=project_uuid,
+            project_id=project_id,
             after_json={
                 "doc_type": payload.doc_type,
                 "title": payload.title,
@@ -133,28 +167,22 @@ def create_document(
             },
             ip=client_ip,
             user_agent=user_agent,
-        )
+        ))
     except ImportError:
         # Audit service not available, log to console for now
         import logging
         logger = logging.getLogger(__name__)
         logger.warning(f"Audit logging not available. Document created: {document.id} by user {current_user.id}")
     
-    db.commit()
-    db.refresh(document)
+    await db.commit()
     return document
 
 
 @router.get("/documents/{document_id}", response_model=DocumentRead)
-def get_document(
-    document_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_active_user)
+async def get_document(
+    document_id: UUID, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_active_user)
 ):
-    from uuid import UUID
-    try:
-        doc_uuid = UUID(document_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid document ID format")
-    document = db.query(Document).filter(Document.id == doc_uuid).first()
+    document = await db.get(Document, document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     return document
@@ -165,27 +193,24 @@ def get_document(
     response_model=DocumentVersionRead,
     status_code=status.HTTP_201_CREATED,
 )
-def create_version(
-    document_id: str,
+async def create_version(
+    document_id: UUID,
     payload: DocumentVersionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user),
 ):
-    from uuid import UUID
-    try:
-        doc_uuid = UUID(document_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid document ID format")
-    
-    document = db.query(Document).filter(Document.id == doc_uuid).first()
+    # Lock the document row so concurrent create_version calls can't pick the same version number
+    document = await db.get(Document, document_id, with_for_update=True)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    existing_count = db.query(DocumentVersion).filter(DocumentVersion.document_id == doc_uuid).count()
-    version_string = payload.version_string or f"v{existing_count + 1}"
+    # Next "v{n}" label is computed inside the INSERT instead of a separate COUNT round trip
+    version_string = payload.version_string or select(
+        func.concat("v", func.count() + 1)
+    ).where(DocumentVersion.document_id == document_id).scalar_subquery()
     
     version = DocumentVersion(
-        document_id=doc_uuid,
+        document_id=document_id,
         version_string=version_string,
         state=DocumentState.DRAFT.value,
         template_id=payload.template_id,
@@ -194,117 +219,52 @@ def create_version(
         created_by=current_user.id,
     )
     db.add(version)
-    db.commit()
-    db.refresh(version)
+    await db.flush()  # INSERT the version before documents.current_version_id points at it
     document.current_version_id = version.id
-    db.add(document)
-    db.commit()
-    return version
+    await db.commit()
+    return await _get_version_with_template(db, version.id)
 
 
-@router.get("/documents/{document_id}/versions", response_model=list[DocumentVersionRead])
-def list_versions(
-    document_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_active_user)
+@router.get("/documents/{document_id}/versions", response_model=list[DocumentVersionListItem])
+async def list_versions(
+    document_id: UUID, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_active_user)
 ):
-    from uuid import UUID
-    try:
-        doc_uuid = UUID(document_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid document ID format")
-    document = db.query(Document).filter(Document.id == doc_uuid).first()
+    document = await db.get(Document, document_id)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
-    from app.models import Template
-    versions = db.query(DocumentVersion).filter(DocumentVersion.document_id == doc_uuid).order_by(DocumentVersion.created_at.desc()).all()
-    # Convert to dicts and add template info
-    result = []
-    for version in versions:
-        version_dict = {
-            "id": str(version.id),
-            "document_id": str(version.document_id),
-            "version_string": version.version_string,
-            "state": version.state,
-            "template_id": str(version.template_id) if version.template_id else None,
-            "content_json": version.content_json,
-            "pkb_snapshot_id": str(version.pkb_snapshot_id) if version.pkb_snapshot_id else None,
-            "file_object_key": version.file_object_key,
-            "file_hash": version.file_hash,
-            "created_by": str(version.created_by),
-            "created_at": version.created_at,
-            "submitted_at": version.submitted_at,
-            "locked_at": version.locked_at,
-        }
-        if version.template_id:
-            template = db.query(Template).filter(Template.id == version.template_id).first()
-            if template:
-                version_dict["template"] = {
-                    "id": str(template.id),
-                    "doc_type": template.doc_type,
-                    "name": template.name,
-                    "object_key": template.object_key,
-                    "file_hash": template.file_hash,
-                }
-        result.append(version_dict)
-    return result
+    # Versions usually share a few templates - one IN query instead of one query per version
+    versions = (await db.scalars(
+        select(DocumentVersion)
+        .options(
+            # content_json can hold large editor payloads - clients load it per version via GET /versions/{id}
+            load_only(*_VERSION_LIST_COLUMNS),
+            selectinload(DocumentVersion.template).load_only(*_VERSION_TEMPLATE_COLUMNS),
+        )
+        .where(DocumentVersion.document_id == document_id)
+        .order_by(DocumentVersion.created_at.desc())
+    )).all()
+    return versions
 
 
 @router.get("/versions/{version_id}", response_model=DocumentVersionRead)
-def get_version(
-    version_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_active_user)
+async def get_version(
+    version_id: UUID, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_active_user)
 ):
-    from uuid import UUID
-    from app.models import Template
-    try:
-        version_uuid = UUID(version_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid version ID format")
-    version = db.query(DocumentVersion).filter(DocumentVersion.id == version_uuid).first()
+    version = await _get_version_with_template(db, version_id)
     if not version:
         raise HTTPException(status_code=404, detail="Version not found")
-    
-    # Convert to dict and add template info
-    version_dict = {
-        "id": str(version.id),
-        "document_id": str(version.document_id),
-        "version_string": version.version_string,
-        "state": version.state,
-        "template_id": str(version.template_id) if version.template_id else None,
-        "content_json": version.content_json,
-        "pkb_snapshot_id": str(version.pkb_snapshot_id) if version.pkb_snapshot_id else None,
-        "file_object_key": version.file_object_key,
-        "file_hash": version.file_hash,
-        "created_by": str(version.created_by),
-        "created_at": version.created_at,
-        "submitted_at": version.submitted_at,
-        "locked_at": version.locked_at,
-    }
-    if version.template_id:
-        template = db.query(Template).filter(Template.id == version.template_id).first()
-        if template:
-            version_dict["template"] = {
-                "id": str(template.id),
-                "doc_type": template.doc_type,
-                "name": template.name,
-                "object_key": template.object_key,
-                "file_hash": template.file_hash,
-            }
-    return version_dict
+    return version
 
 
 @router.put("/versions/{version_id}", response_model=DocumentVersionRead)
-def update_version(
+async def update_version(
     request: Request,
-    version_id: str,
+    version_id: UUID,
     payload: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user)
 ):
-    from uuid import UUID
-    try:
-        version_uuid = UUID(version_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid version ID format")
-    version = db.query(DocumentVersion).filter(DocumentVersion.id == version_uuid).first()
+    version = await db.get(DocumentVersion, version_id)
     if not version:
         raise HTTPException(status_code=404, detail="Version not found")
     
@@ -328,56 +288,50 @@ def update_version(
             version.submitted_at = datetime.utcnow()
             version.locked_at = datetime.utcnow()
     
-    db.add(version)
-    db.commit()
-    db.refresh(version)
-    return version
+    await db.commit()
+    return await _get_version_with_template(db, version.id)
 
 
 @router.put("/documents/{document_id}", response_model=DocumentRead)
-def update_document(
-    document_id: str,
+async def update_document(
+    document_id: UUID,
     payload: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user)
 ):
-    from uuid import UUID
-    try:
-        doc_uuid = UUID(document_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid document ID format")
-    document = db.query(Document).filter(Document.id == doc_uuid).first()
-    if not document:
+    row = (await db.execute(
+        select(Document, ProjectMember.user_id.label("member_user_id"))
+        .outerjoin(ProjectMember, _active_membership(Document.project_id, current_user.id))
+        .where(Document.id == document_id)
+    )).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Document not found")
+    if row.member_user_id is None:
+        raise HTTPException(
+            status_code=403,
+            detail="Access denied: You must be a member of this project to edit documents"
+        )
+    document = row.Document
     
     if "title" in payload:
         document.title = payload["title"]
     if "doc_type" in payload:
         document.doc_type = payload["doc_type"]
     
-    db.add(document)
-    db.commit()
-    db.refresh(document)
+    await db.commit()
     return document
 
 
 @router.post("/versions/{version_id}/submit", response_model=DocumentVersionRead)
-def submit_version(
-    version_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_active_user)
+async def submit_version(
+    version_id: UUID, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_active_user)
 ):
-    from uuid import UUID
-    try:
-        version_uuid = UUID(version_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid version ID format")
-    version = db.query(DocumentVersion).filter(DocumentVersion.id == version_uuid).first()
+    version = await db.get(DocumentVersion, version_id)
     if not version:
         raise HTTPException(status_code=404, detail="Version not found")
     version.state = DocumentState.IN_REVIEW.value
     version.submitted_at = datetime.utcnow()
     version.locked_at = datetime.utcnow()
-    db.add(version)
-    db.commit()
-    db.refresh(version)
-    return version
+    await db.commit()
+    return await _get_version_with_template(db, version.id)
 
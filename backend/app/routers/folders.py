@@ -1,15 +1,33 @@
+from collections import defaultdict
+import logging
+import traceback
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import exists, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
 from typing import List, Optional
 from uuid import UUID
 
 from app.db import get_db
 from app.dependencies import get_current_active_user
 from app.models import ProjectFolder, Project, User
+from app.routers._org_resolution import resolve_user_org_id
 from app.schemas.folders import ProjectFolderCreate, ProjectFolderRead, ProjectFolderTree, MoveProjectRequest
 from app.core.enums import RoleCode
 
 router = APIRouter(prefix="/folders", tags=["folders"])
+logger = logging.getLogger(__name__)
+
+DUPLICATE_FOLDER_DETAIL = "Folder with this name already exists in this location"
+_FOLDER_NAME_CONSTRAINTS = frozenset({"uq_folder_org_name_parent", "uq_folder_org_root_name"})
+
+
+def _is_duplicate_name_error(error: IntegrityError) -> bool:
+    """True if the IntegrityError came from one of the folder-name unique constraints."""
+    diag = getattr(error.orig, "diag", None)
+    return getattr(diag, "constraint_name", None) in _FOLDER_NAME_CONSTRAINTS
 
 
 def check_is_org_admin(current_user: User, db: Session):
@@ -30,51 +48,15 @@ def create_folder(
     check_is_org_admin(current_user, db)
     
     # Get user's org_id from first project they're a member of, or use/create default org
-    from app.models import ProjectMember, Org
-    member = db.query(ProjectMember).filter(ProjectMember.user_id == current_user.id).first()
-    
-    if member:
-        project = db.query(Project).filter(Project.id == member.project_id).first()
-        if project:
-            org_id = project.org_id
-        else:
-            # Member exists but project doesn't - use default org
-            default_org = db.query(Org).first()
-            if not default_org:
-                import uuid
-                default_org = Org(id=uuid.uuid4(), name="Default Organization")
-                db.add(default_org)
-                db.commit()
-                db.refresh(default_org)
-            org_id = default_org.id
-    else:
-        # User is not a member of any project - use or create default org
-        default_org = db.query(Org).first()
-        if not default_org:
-            import uuid
-            default_org = Org(id=uuid.uuid4(), name="Default Organization")
-            db.add(default_org)
-            db.commit()
-            db.refresh(default_org)
-        org_id = default_org.id
-    
-    # Check if folder with same name already exists in same parent
-    existing = db.query(ProjectFolder).filter(
-        ProjectFolder.org_id == org_id,
-        ProjectFolder.name == folder_data.name,
-        ProjectFolder.parent_folder_id == folder_data.parent_folder_id
-    ).first()
-    
-    if existing:
-        raise HTTPException(status_code=400, detail="Folder with this name already exists in this location")
+    org_id = resolve_user_org_id(db, current_user, create_default=True)
     
     # Validate parent folder exists if provided
     if folder_data.parent_folder_id:
-        parent = db.query(ProjectFolder).filter(
+        parent_exists = db.query(exists().where(
             ProjectFolder.id == folder_data.parent_folder_id,
             ProjectFolder.org_id == org_id
-        ).first()
-        if not parent:
+        )).scalar()
+        if not parent_exists:
             raise HTTPException(status_code=404, detail="Parent folder not found")
     
     folder = ProjectFolder(
@@ -85,7 +67,14 @@ def create_folder(
     )
     
     db.add(folder)
-    db.commit()
+    # Duplicate names in the same parent are rejected by the unique constraint/index
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if not _is_duplicate_name_error(e):
+            raise
+        raise HTTPException(status_code=400, detail=DUPLICATE_FOLDER_DETAIL)
     db.refresh(folder)
     
     return ProjectFolderRead.model_validate(folder)
@@ -98,70 +87,59 @@ def list_folders_tree(
 ):
     """Get folder tree structure with projects"""
     try:
-        # Get user's org_id
-        from app.models import ProjectMember, Org
-        
-        # Try to get org_id from user's project membership
-        member = db.query(ProjectMember).filter(ProjectMember.user_id == current_user.id).first()
-        
-        if member:
-            project = db.query(Project).filter(Project.id == member.project_id).first()
-            if project:
-                org_id = project.org_id
-            else:
-                # Member exists but project doesn't - use default org
-                default_org = db.query(Org).first()
-                if not default_org:
-                    return []
-                org_id = default_org.id
-        else:
-            # User is not a member of any project - use default org
-            default_org = db.query(Org).first()
-            if not default_org:
-                return []
-            org_id = default_org.id
+        # Get user's org_id from their project membership, falling back to the default org
+        org_id = resolve_user_org_id(db, current_user)
+        if not org_id:
+            return []
         
-        # Get all folders for this org
+        # Get all folders for this org - only the columns the tree uses, as plain rows (no ORM objects)
         try:
-            all_folders = db.query(ProjectFolder).filter(ProjectFolder.org_id == org_id).all()
+            all_folders = db.query(
+                ProjectFolder.id, ProjectFolder.name, ProjectFolder.parent_folder_id
+            ).filter(ProjectFolder.org_id == org_id).all()
         except Exception as e:
             # Table might not exist if migration hasn't been run
-            import logging
-            logging.getLogger(__name__).warning(f"ProjectFolder table might not exist: {e}")
+            logger.warning(f"ProjectFolder table might not exist: {e}")
             return []
         
-        # Get all projects for this org
+        # Get all projects for this org (same: column rows only)
         try:
-            all_projects = db.query(Project).filter(Project.org_id == org_id).all()
+            all_projects = db.query(
+                Project.id, Project.name, Project.key, Project.status, Project.folder_id
+            ).filter(Project.org_id == org_id).all()
         except Exception as e:
-            import logging
-            logging.getLogger(__name__).warning(f"Error querying projects: {e}")
+            logger.warning(f"Error querying projects: {e}")
             return []
         
-        # Build tree structure recursively
-        def build_tree(parent_id=None):
-            folders_in_level = [f for f in all_folders if f.parent_folder_id == parent_id]
-            result = []
-            
-            for folder in folders_in_level:
-                folder_data = {
-                    "id": folder.id,
-                    "name": folder.name,
-                    "parent_folder_id": folder.parent_folder_id,
-                    "subfolders": build_tree(folder.id),
-                    "projects": [{"id": str(p.id), "name": p.name, "key": p.key, "status": p.status} 
-                                for p in all_projects if getattr(p, 'folder_id', None) == folder.id]
-                }
-                result.append(folder_data)
-            
-            return result
+        # Index projects by folder once (O(N)) instead of rescanning the list per folder
+        projects_by_folder = defaultdict(list)
+        for p in all_projects:
+            projects_by_folder[p.folder_id].append({"id": p.id, "name": p.name, "key": p.key, "status": p.status})
         
-        # Build tree starting from root (None parent)
-        result = build_tree(None)
+        # One node per folder, then link each node into its parent's subfolders in a single
+        # iterative pass (no recursion). Folders whose parent isn't in this org stay unreachable,
+        # as before.
+        nodes = {
+            folder.id: {
+                "id": folder.id,
+                "name": folder.name,
+                "parent_folder_id": folder.parent_folder_id,
+                "subfolders": [],
+                "projects": projects_by_folder.get(folder.id, []),
+            }
+            for folder in all_folders
+        }
+        result = []
+        for folder in all_folders:
+            if folder.parent_folder_id is None:
+                result.append(nodes[folder.id])
+            else:
+                parent = nodes.get(folder.parent_folder_id)
+                if parent is not None:
+                    parent["subfolders"].append(nodes[folder.id])
         
         # Add root projects if any
-        root_projects_list = [{"id": str(p.id), "name": p.name, "key": p.key, "status": p.status} 
-                             for p in all_projects if getattr(p, 'folder_id', None) is None]
+        root_projects_list = projects_by_folder.get(None)
         if root_projects_list:
             result.append({
                 "id": None,  # None for root projects container
@@ -171,13 +149,10 @@ def list_folders_tree(
                 "projects": root_projects_list
             })
         
-        # Convert to dict format - return as-is since we have None IDs for root
-        # FastAPI will serialize dicts automatically
-        return result
+        # Hand the tree straight to orjson (UUIDs serialize natively), skipping FastAPI's
+        # jsonable_encoder pass over every node
+        return ORJSONResponse(result)
     except Exception as e:
-        import logging
-        import traceback
-        logger = logging.getLogger(__name__)
         logger.error(f"Error in list_folders_tree: {e}")
         logger.error(traceback.format_exc())
         # Return empty list instead of raising error to prevent UI breakage
@@ -186,7 +161,7 @@ def list_folders_tree(
 
 @router.put("/{folder_id}", response_model=ProjectFolderRead)
 def update_folder(
-    folder_id: str,
+    folder_id: UUID,
     folder_data: ProjectFolderCreate,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_active_user),
@@ -194,30 +169,21 @@ def update_folder(
     """Update a folder (ORG_ADMIN only)"""
     check_is_org_admin(current_user, db)
     
-    try:
-        folder_uuid = UUID(folder_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid folder ID format")
-    
-    folder = db.query(ProjectFolder).filter(ProjectFolder.id == folder_uuid).first()
+    folder = db.query(ProjectFolder).filter(ProjectFolder.id == folder_id).first()
     if not folder:
         raise HTTPException(status_code=404, detail="Folder not found")
     
-    # Check for duplicate name in same parent
-    existing = db.query(ProjectFolder).filter(
-        ProjectFolder.org_id == folder.org_id,
-        ProjectFolder.name == folder_data.name,
-        ProjectFolder.parent_folder_id == folder_data.parent_folder_id,
-        ProjectFolder.id != folder_uuid
-    ).first()
-    
-    if existing:
-        raise HTTPException(status_code=400, detail="Folder with this name already exists in this location")
-    
     folder.name = folder_data.name
     folder.parent_folder_id = folder_data.parent_folder_id
     
-    db.commit()
+    # Duplicate names in the same parent are rejected by the unique constraint/index
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if not _is_duplicate_name_error(e):
+            raise
+        raise HTTPException(status_code=400, detail=DUPLICATE_FOLDER_DETAIL)
     db.refresh(folder)
     
     return ProjectFolderRead.model_validate(folder)
@@ -225,41 +191,40 @@ def update_folder(
 
 @router.delete("/{folder_id}", response_model=dict)
 def delete_folder(
-    folder_id: str,
+    folder_id: UUID,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_active_user),
 ):
     """Delete a folder (ORG_ADMIN only)"""
     check_is_org_admin(current_user, db)
     
-    try:
-        folder_uuid = UUID(folder_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid folder ID format")
-    
-    folder = db.query(ProjectFolder).filter(ProjectFolder.id == folder_uuid).first()
-    if not folder:
+    # Folder plus both "has children" signals in one round-trip; the subfolder EXISTS uses an
+    # alias so it is not correlated with the outer folder row
+    subfolder = aliased(ProjectFolder)
+    row = db.query(
+        ProjectFolder,
+        exists().where(subfolder.parent_folder_id == folder_id).label("has_subfolders"),
+        exists().where(Project.folder_id == folder_id).label("has_projects"),
+    ).filter(ProjectFolder.id == folder_id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Folder not found")
+    folder, has_subfolders, has_projects = row
     
-    # Check if folder has subfolders
-    subfolders = db.query(ProjectFolder).filter(ProjectFolder.parent_folder_id == folder_uuid).count()
-    if subfolders > 0:
+    if has_subfolders:
         raise HTTPException(status_code=400, detail="Cannot delete folder with subfolders. Delete subfolders first.")
     
-    # Check if folder has projects
-    projects_count = db.query(Project).filter(Project.folder_id == folder_uuid).count()
-    if projects_count > 0:
+    if has_projects:
         raise HTTPException(status_code=400, detail="Cannot delete folder with projects. Move projects first.")
     
     db.delete(folder)
     db.commit()
     
-    return {"id": str(folder_uuid), "status": "deleted"}
+    return {"id": str(folder_id), "status": "deleted"}
 
 
 @router.post("/projects/{project_id}/move", response_model=dict)
 def move_project(
-    project_id: str,
+    project_id: UUID,
     move_data: MoveProjectRequest,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_active_user),
@@ -267,26 +232,26 @@ def move_project(
     """Move a project to a different folder (ORG_ADMIN only)"""
     check_is_org_admin(current_user, db)
     
-    try:
-        project_uuid = UUID(project_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid project ID format")
-    
-    project = db.query(Project).filter(Project.id == project_uuid).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Validate folder exists if provided
+    # Single UPDATE ... RETURNING; the folder's existence and org are checked in the WHERE clause
+    stmt = update(Project).where(Project.id == project_id)
     if move_data.folder_id:
-        folder = db.query(ProjectFolder).filter(ProjectFolder.id == move_data.folder_id).first()
-        if not folder:
+        stmt = stmt.where(Project.org_id == select(ProjectFolder.org_id).where(
+            ProjectFolder.id == move_data.folder_id
+        ).scalar_subquery())
+    moved_id = db.execute(
+        stmt.values(folder_id=move_data.folder_id).returning(Project.id)
+    ).scalar_one_or_none()
+    if moved_id is None:
+        # Nothing updated: work out which check failed (error path only)
+        db.rollback()
+        project_org_id = db.query(Project.org_id).filter(Project.id == project_id).scalar()
+        if project_org_id is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+        folder_org_id = db.query(ProjectFolder.org_id).filter(ProjectFolder.id == move_data.folder_id).scalar()
+        if folder_org_id is None:
             raise HTTPException(status_code=404, detail="Folder not found")
-        if folder.org_id != project.org_id:
-            raise HTTPException(status_code=400, detail="Folder belongs to different organization")
-    
-    project.folder_id = move_data.folder_id
+        raise HTTPException(status_code=400, detail="Folder belongs to different organization")
     db.commit()
-    db.refresh(project)
     
-    return {"id": str(project_uuid), "folder_id": str(move_data.folder_id) if move_data.folder_id else None, "status": "moved"}
+    return {"id": str(project_id), "folder_id": str(move_data.folder_id) if move_data.folder_id else None, "status": "moved"}
 
@@ -1,107 +1,50 @@
-from datetime import datetime, timezone
-import traceback
+import logging
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import and_, func, or_, select, update
 
-from app.db import get_db
+from app.db import get_async_db
 from app.dependencies import get_current_active_user
 from app.schemas import ProjectMemberInvite, ProjectMemberRead
-from app.models import ProjectMember, Project
+from app.schemas.auth import UserRead
+from app.models import ProjectMember, Project, User
+from app.rbac import invalidate_membership_cache_async
 
 router = APIRouter(prefix="/projects/{project_id}/members", tags=["members"])
+logger = logging.getLogger(__name__)
+
+
+def _utc_now():
+    """DB-side current time as a naive UTC timestamp, matching how expires_at is stored."""
+    return func.timezone("UTC", func.now())
 
 
 @router.get("", response_model=list[ProjectMemberRead])
-def list_members(
-    project_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_active_user)
+async def list_members(
+    project_id: UUID, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_active_user)
 ):
-    from uuid import UUID
-    from app.models import User
-    from app.schemas.auth import UserRead
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    try:
-        project_uuid = UUID(project_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid project ID format")
-    
     try:
-        # Filter out expired members
-        from datetime import datetime
-        members = db.query(ProjectMember).filter(
-            ProjectMember.project_id == project_uuid
-        ).filter(
-            or_(
-                ProjectMember.expires_at.is_(None),
-                ProjectMember.expires_at > datetime.now(timezone.utc)
+        # Filter out expired members; NOW() is evaluated by the DB so the statement stays constant
+        # selectinload: member users come from one follow-up IN query, not one query per member;
+        # load_only limits it to the UserRead columns (skips password_hash, auth_provider, ...)
+        members = (await db.scalars(
+            select(ProjectMember).options(
+                selectinload(ProjectMember.user).load_only(User.id, User.email, User.name, User.is_active)
+            ).where(
+                ProjectMember.project_id == project_id
+            ).where(
+                or_(
+                    ProjectMember.expires_at.is_(None),
+                    ProjectMember.expires_at > _utc_now()
+                )
             )
-        ).all()
+        )).all()
         
-        # Include user details in response
-        result = []
-        for member in members:
-            try:
-                user = db.query(User).filter(User.id == member.user_id).first()
-                if user:
-                    try:
-                        user_data = UserRead.model_validate(user)
-                    except Exception as user_validate_error:
-                        logger.error(f"Error validating user {user.id} for member {member.id}: {str(user_validate_error)}", exc_info=True)
-                        user_data = None
-                else:
-                    user_data = None
-                
-                try:
-                    result.append(ProjectMemberRead(
-                        id=member.id,
-                        project_id=member.project_id,
-                        user_id=member.user_id,
-                        role_code=member.role_code,
-                        is_temporary=member.is_temporary,
-                        expires_at=member.expires_at,
-                        invited_by=member.invited_by,
-                        created_at=member.created_at,
-                        user=user_data
-                    ))
-                except Exception as read_error:
-                    logger.error(f"Error creating ProjectMemberRead for member {member.id}: {str(read_error)}", exc_info=True)
-                    # Still add member without user data
-                    result.append(ProjectMemberRead(
-                        id=member.id,
-                        project_id=member.project_id,
-                        user_id=member.user_id,
-                        role_code=member.role_code,
-                        is_temporary=member.is_temporary,
-                        expires_at=member.expires_at,
-                        invited_by=member.invited_by,
-                        created_at=member.created_at,
-                        user=None
-                    ))
-            except Exception as e:
-                # Log error but continue processing other members
-                logger.error(f"Error processing member {member.id}: {str(e)}", exc_info=True)
-                # Still add member without user data
-                try:
-                    result.append(ProjectMemberRead(
-                        id=member.id,
-                        project_id=member.project_id,
-                        user_id=member.user_id,
-                        role_code=member.role_code,
-                        is_temporary=member.is_temporary,
-                        expires_at=member.expires_at,
-                        invited_by=member.invited_by,
-                        created_at=member.created_at,
-                        user=None
-                    ))
-                except Exception as final_error:
-                    logger.error(f"Error creating ProjectMemberRead (fallback) for member {member.id}: {str(final_error)}", exc_info=True)
-                    # Skip this member if we can't even create a basic response
-                    continue
-        
-        return result
+        # Member + user details straight from the ORM objects (user comes from selectinload)
+        return [ProjectMemberRead.model_validate(member) for member in members]
     except Exception as e:
         logger.error(f"Error in list_members for project {project_id}: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -111,72 +54,58 @@ def list_members(
 
 
 @router.post("", response_model=ProjectMemberRead, status_code=status.HTTP_201_CREATED)
-def invite_member(
-    project_id: str,
+async def invite_member(
+    project_id: UUID,
     payload: ProjectMemberInvite,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user),
 ):
-    from uuid import UUID
-    from app.models import User
-    from app.schemas.auth import UserRead
-    import logging
-    logger = logging.getLogger(__name__)
-    
     try:
-        # Log incoming request
-        logger.info(f"Invite member request: project_id={project_id}, payload={payload.model_dump()}, current_user={current_user.email if current_user else 'None'}")
-        print(f"INVITE MEMBER: project_id={project_id}, payload={payload.model_dump()}, current_user={current_user.email if current_user else 'None'}")
+        # Log incoming request; model_dump() only runs when debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Invite member request: project_id={project_id}, payload={payload.model_dump()}, current_user={current_user.email if current_user else 'None'}")
         
-        try:
-            project_uuid = UUID(project_id)
-        except ValueError:
-            logger.error(f"Invalid project ID format: {project_id}")
-            print(f"ERROR: Invalid project ID format: {project_id}")
-            raise HTTPException(status_code=400, detail="Invalid project ID format")
-    
-        project = db.query(Project).filter(Project.id == project_uuid).first()
-        if not project:
-            logger.error(f"Project not found: {project_uuid}")
-            print(f"ERROR: Project not found: {project_uuid}")
+        # Project, invited user and any existing membership (with its SQL-side expiry flag)
+        # in one round-trip
+        row = (await db.execute(
+            select(
+                Project.id,
+                User,
+                ProjectMember,
+                (ProjectMember.expires_at < _utc_now()).label("expired"),
+            )
+            .select_from(Project)
+            .outerjoin(User, User.id == payload.user_id)
+            .outerjoin(ProjectMember, and_(
+                ProjectMember.project_id == Project.id,
+                ProjectMember.user_id == payload.user_id
+            ))
+            .where(Project.id == project_id)
+        )).first()
+        if not row:
+            logger.error(f"Project not found: {project_id}")
             raise HTTPException(status_code=404, detail="Project not found")
+        _, user, existing, expired = row
         
-        # Validate user exists
-        user = db.query(User).filter(User.id == payload.user_id).first()
         if not user:
             logger.error(f"User not found: {payload.user_id}")
-            print(f"ERROR: User not found: {payload.user_id}")
             raise HTTPException(status_code=404, detail="User not found")
         
-        # Check if user is already a member
-        existing = db.query(ProjectMember).filter(
-            ProjectMember.project_id == project_uuid,
-            ProjectMember.user_id == payload.user_id
-        ).first()
         if existing:
-            # Check if expired
-            # Ensure both datetimes are timezone-aware for comparison
-            now = datetime.now(timezone.utc)
-            expires_at = existing.expires_at
-            # If expires_at is naive, make it aware; if already aware, keep it
-            if expires_at:
-                if expires_at.tzinfo is None:
-                    expires_at = expires_at.replace(tzinfo=timezone.utc)
-                if expires_at < now:
+            if existing.expires_at:
+                if expired:
                     # Reactivate expired member
                     try:
                         existing.role_code = payload.role_code
                         existing.is_temporary = payload.is_temporary
                         existing.expires_at = payload.expires_at if payload.is_temporary and payload.expires_at else None
                         existing.invited_by = current_user.id
-                        db.add(existing)
-                        db.commit()
-                        db.refresh(existing)
+                        await db.commit()
+                        await db.refresh(existing)
+                        await invalidate_membership_cache_async(project_id, existing.user_id)
                         try:
                             user_data = UserRead.model_validate(user)
                         except Exception as user_error:
-                            import logging
-                            logger = logging.getLogger(__name__)
                             logger.error(f"Error validating user data in reactivate: {str(user_error)}", exc_info=True)
                             user_data = None
                         return ProjectMemberRead(
@@ -191,9 +120,7 @@ def invite_member(
                             user=user_data
                         )
                     except Exception as reactivate_error:
-                        db.rollback()
-                        import logging
-                        logger = logging.getLogger(__name__)
+                        await db.rollback()
                         logger.error(f"Error reactivating member: {str(reactivate_error)}", exc_info=True)
                         raise HTTPException(
                             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -207,7 +134,7 @@ def invite_member(
         
         try:
             membership = ProjectMember(
-                project_id=project_uuid,
+                project_id=project_id,
                 user_id=payload.user_id,
                 role_code=payload.role_code,
                 is_temporary=payload.is_temporary,
@@ -215,15 +142,14 @@ def invite_member(
                 invited_by=current_user.id,
             )
             db.add(membership)
-            db.commit()
-            db.refresh(membership)
+            await db.commit()
+            await db.refresh(membership)
+            await invalidate_membership_cache_async(project_id, membership.user_id)
             
             # Include user details in response
             try:
                 user_data = UserRead.model_validate(user)
             except Exception as user_error:
-                import logging
-                logger = logging.getLogger(__name__)
                 logger.error(f"Error validating user data: {str(user_error)}", exc_info=True)
                 user_data = None
             
@@ -240,8 +166,6 @@ def invite_member(
                     user=user_data
                 )
             except Exception as read_error:
-                import logging
-                logger = logging.getLogger(__name__)
                 logger.error(f"Error creating ProjectMemberRead: {str(read_error)}", exc_info=True)
                 # Return basic response even if serialization fails
                 return ProjectMemberRead(
@@ -259,18 +183,12 @@ def invite_member(
             # Re-raise HTTP exceptions as-is
             raise
         except Exception as e:
-            db.rollback()
-            logger.error(f"Error creating membership for role '{payload.role_code}': {str(e)}", exc_info=True)
+            await db.rollback()
+            logger.exception(f"Error creating membership for role '{payload.role_code}': {str(e)}")
             logger.error(f"Error type: {type(e).__name__}")
             logger.error(f"Payload: {payload.model_dump()}")
             logger.error(f"Project ID: {project_id}")
             logger.error(f"Current user: {current_user.email if current_user else 'None'}")
-            print(f"ERROR creating membership: {str(e)}")
-            print(f"Error type: {type(e).__name__}")
-            print(f"Payload: {payload.model_dump()}")
-            print(f"Project ID: {project_id}")
-            print(f"Current user: {current_user.email if current_user else 'None'}")
-            traceback.print_exc()
             
             # Check if it's a unique constraint error
             error_str = str(e).lower()
@@ -297,9 +215,7 @@ def invite_member(
         # Re-raise HTTP exceptions as-is
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in invite_member: {str(e)}", exc_info=True)
-        print(f"UNEXPECTED ERROR in invite_member: {str(e)}")
-        traceback.print_exc()
+        logger.exception(f"Unexpected error in invite_member: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Unexpected error: {str(e)}"
@@ -307,28 +223,18 @@ def invite_member(
 
 
 @router.put("/{member_id}", response_model=ProjectMemberRead)
-def update_member(
-    project_id: str,
-    member_id: str,
+async def update_member(
+    project_id: UUID,
+    member_id: UUID,
     payload: ProjectMemberInvite,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user),
 ):
     """Update member role"""
-    from uuid import UUID
-    from app.models import User
-    from app.schemas.auth import UserRead
-    
-    try:
-        project_uuid = UUID(project_id)
-        member_uuid = UUID(member_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid ID format")
     
-    membership = (
-        db.query(ProjectMember)
-        .filter(ProjectMember.project_id == project_uuid, ProjectMember.id == member_uuid)
-        .first()
+    membership = await db.scalar(
+        select(ProjectMember)
+        .where(ProjectMember.project_id == project_id, ProjectMember.id == member_id)
     )
     if not membership:
         raise HTTPException(status_code=404, detail="Member not found")
@@ -341,12 +247,12 @@ def update_member(
     else:
         membership.expires_at = None
     
-    db.add(membership)
-    db.commit()
-    db.refresh(membership)
+    await db.commit()
+    await db.refresh(membership)
+    await invalidate_membership_cache_async(project_id, membership.user_id)
     
     # Include user details
-    user = db.query(User).filter(User.id == membership.user_id).first()
+    user = await db.get(User, membership.user_id)
     user_data = UserRead.model_validate(user) if user else None
     return ProjectMemberRead(
         id=membership.id,
@@ -362,38 +268,26 @@ def update_member(
 
 
 @router.post("/{member_id}/disable", response_model=ProjectMemberRead)
-def disable_member(
-    project_id: str,
-    member_id: str,
-    db: Session = Depends(get_db),
+async def disable_member(
+    project_id: UUID,
+    member_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user),
 ):
-    from uuid import UUID
-    from app.models import User
-    from app.schemas.auth import UserRead
-    
-    try:
-        project_uuid = UUID(project_id)
-        member_uuid = UUID(member_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid ID format")
-    
-    membership = (
-        db.query(ProjectMember)
-        .filter(ProjectMember.project_id == project_uuid, ProjectMember.id == member_uuid)
-        .first()
+    # Disable by expiring now, in a single UPDATE ... RETURNING (no load + mutate + refresh)
+    membership = await db.scalar(
+        update(ProjectMember)
+        .where(ProjectMember.project_id == project_id, ProjectMember.id == member_id)
+        .values(expires_at=_utc_now())
+        .returning(ProjectMember)
     )
     if not membership:
         raise HTTPException(status_code=404, detail="Member not found")
-    
-    # Set expiration to now to disable
-    membership.expires_at = datetime.now(timezone.utc)
-    db.add(membership)
-    db.commit()
-    db.refresh(membership)
+    await db.commit()
+    await invalidate_membership_cache_async(project_id, membership.user_id)
     
     # Include user details
-    user = db.query(User).filter(User.id == membership.user_id).first()
+    user = await db.get(User, membership.user_id)
     user_data = UserRead.model_validate(user) if user else None
     return ProjectMemberRead(
         id=membership.id,
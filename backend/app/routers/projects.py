@@ -1,227 +1,254 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import or_, select, text, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, joinedload
 from typing import Optional
 from datetime import datetime
+from uuid import UUID, uuid4
+import copy
+import functools
+import hashlib
 import logging
+import re
+import traceback
 
-from app.db import get_db
+import orjson
+
+from app.db import get_async_db, get_db
 from app.dependencies import get_current_active_user
 from app.schemas import ProjectCreate, ProjectRead, ProjectUpdate
+from app.schemas.auth import UserRead
 from app.schemas.tasks import GenerateTasksFromRACIRequest, TaskRead
-from app.models import Project, User
+from app.models import Project, ProjectFolder, ProjectMember, Task, User
+from app.models.entities import utcnow
+from app.core.enums import RoleCode, TaskStatus
+from app.rbac import invalidate_membership_cache_async
+from app.routers._org_resolution import get_default_org_id_async
+from app.services.cache import cache_get, cache_get_async, cache_is_shared, cache_set, cache_set_async
+from app.services.membership import invalidate_user_org_ids_async
+from app.services.project_cache import (
+    MY_PROJECTS_CACHE_TTL,
+    RACI_CACHE_TTL,
+    TEAM_MEMBERS_CACHE_TTL,
+    invalidate_my_projects_async,
+    invalidate_raci_async,
+    my_projects_cache_key,
+    raci_cache_key,
+    team_members_cache_key,
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/projects", tags=["projects"])
 
+# RACI task names like "TG (TG 3)" become "TG 3 Trial" creation tasks
+_TG_RE = re.compile(r'TG\s*\(TG\s*(\d+)\)', re.IGNORECASE)
+
+
+# The ProjectRead columns, selected as plain rows instead of loading full Project entities
+_PROJECT_READ_COLUMNS = (
+    Project.id,
+    Project.org_id,
+    Project.folder_id,
+    Project.key,
+    Project.name,
+    Project.status,
+    Project.retention_policy_json,
+    Project.raci_matrix_json,
+    Project.created_at,
+)
+
+
+def _project_read(row) -> ProjectRead:
+    """ProjectRead from a _PROJECT_READ_COLUMNS row without re-validating DB-sourced values"""
+    return ProjectRead.model_construct(**row._mapping)
+
+
+def _json_response(request: Request, body: str) -> Response:
+    """
+    Response for an already-encoded JSON body (e.g. one served from the cache).
+    The ETag is a hash of the body, so an If-None-Match hit is answered with an empty 304.
+    """
+    etag = f'"{hashlib.blake2b(body.encode(), digest_size=16).hexdigest()}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+    return Response(content=body, media_type="application/json", headers=cache_headers)
+
+
+async def _invalidate_project_reads(db: AsyncSession, project_uuid) -> None:
+    """Drop cached /raci and members' /my-projects responses after the project row changes"""
+    
+    member_user_ids = (await db.scalars(
+        select(ProjectMember.user_id).where(ProjectMember.project_id == project_uuid)
+    )).all()
+    await invalidate_my_projects_async(*member_user_ids)
+    await invalidate_raci_async(project_uuid)
+
 
 @router.get("/my-projects", response_model=list[ProjectRead])
-def list_my_projects(db: Session = Depends(get_db), current_user=Depends(get_current_active_user)):
-    """List projects where current user is a member"""
+async def list_my_projects(
+    request: Request, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_active_user)
+):
+    """List projects where current user is a member. Supports If-None-Match (ETag of the response body)."""
     try:
-        from app.models import ProjectMember
-        from datetime import datetime, timezone
-        from sqlalchemy import or_
-        
-        logger.info(f"Loading projects for user {current_user.id} ({current_user.email})")
-        
-        # Get projects where user is a member
-        memberships = db.query(ProjectMember).filter(
-            ProjectMember.user_id == current_user.id
-        ).filter(
-            or_(
-                ProjectMember.expires_at.is_(None),
-                ProjectMember.expires_at > datetime.now(timezone.utc)
-            )
-        ).all()
         
-        logger.info(f"Found {len(memberships)} project memberships for user {current_user.id}")
+        logger.info("Loading projects for user %s (%s)", current_user.id, current_user.email)
         
-        project_ids = [m.project_id for m in memberships]
-        if not project_ids:
-            logger.info(f"No active project memberships for user {current_user.id}")
-            return []
+        # Membership-scoped: only cached when the cache is shared, so a removal reaches every worker
+        cache_key = my_projects_cache_key(current_user.id)
+        use_cache = cache_is_shared()
+        cached = await cache_get_async(cache_key) if use_cache else None
+        if cached is not None:
+            return _json_response(request, cached)
         
-        projects = db.query(Project).filter(Project.id.in_(project_ids)).all()
-        logger.info(f"Found {len(projects)} projects for user {current_user.id}")
+        # Projects where user is an active member, in one JOIN; (project_id, user_id) is unique,
+        # so no DISTINCT is needed
+        rows = (await db.execute(
+            select(*_PROJECT_READ_COLUMNS).join(
+                ProjectMember, ProjectMember.project_id == Project.id
+            ).where(
+                ProjectMember.user_id == current_user.id,
+                or_(
+                    ProjectMember.expires_at.is_(None),
+                    ProjectMember.expires_at > utcnow()
+                )
+            )
+        )).all()
+        if not rows:
+            logger.info("No active project memberships for user %s", current_user.id)
+            if use_cache:
+                await cache_set_async(cache_key, "[]", ttl=MY_PROJECTS_CACHE_TTL)
+            return _json_response(request, "[]")
+        logger.info("Found %d projects for user %s", len(rows), current_user.id)
         
-        result = []
-        for p in projects:
-            try:
-                project_read = ProjectRead.model_validate(p)
-                result.append(project_read)
-            except Exception as e:
-                logger.warning(f"Error validating project {p.id}: {e}")
-                import traceback
-                logger.warning(traceback.format_exc())
-                try:
-                    project_read = ProjectRead(
-                        id=p.id,
-                        org_id=p.org_id,
-                        folder_id=getattr(p, 'folder_id', None),
-                        key=p.key,
-                        name=p.name,
-                        status=p.status,
-                        retention_policy_json=getattr(p, 'retention_policy_json', None),
-                        raci_matrix_json=getattr(p, 'raci_matrix_json', None),
-                        created_at=p.created_at
-                    )
-                    result.append(project_read)
-                except Exception as e2:
-                    logger.error(f"Failed to create ProjectRead for {p.id}: {e2}")
-                    continue
+        result = [_project_read(row) for row in rows]
         
-        logger.info(f"Returning {len(result)} projects for user {current_user.id}")
-        return result
+        logger.info("Returning %d projects for user %s", len(result), current_user.id)
+        # Rows were built from DB values above; encode them directly instead of re-validating
+        # against response_model, and keep the body for the next request
+        body = orjson.dumps([project_read.model_dump() for project_read in result]).decode()
+        if use_cache:
+            await cache_set_async(cache_key, body, ttl=MY_PROJECTS_CACHE_TTL)
+        return _json_response(request, body)
     except Exception as e:
         logger.error(f"Error in list_my_projects: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error loading projects: {str(e)}")
 
 
-@router.get("/my-tasks")
-def list_my_tasks(
-    db: Session = Depends(get_db),
+# Rows per server-side cursor fetch for the streamed task lists (/my-tasks, /{project_id}/tasks)
+_TASK_STREAM_BATCH_SIZE = 500
+
+
+# Streamed hand-encoded JSON: the schema is documented, not validated per response
+@router.get("/my-tasks", responses={200: {"model": list[TaskRead]}})
+async def list_my_tasks(
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user),
     status: Optional[str] = None,
 ):
     """List tasks assigned to current user"""
-    from app.models.entities import Task
-    from app.core.enums import TaskStatus
     
-    logger.info(f"Loading tasks for user {current_user.id} ({current_user.email})")
+    logger.info("Loading tasks for user %s (%s)", current_user.id, current_user.email)
     
-    query = db.query(Task).filter(Task.assigned_to_user_id == current_user.id)
+    # Assignee/reviewer and project names come from outer joins in the same statement, so rows
+    # can be streamed without collecting every task's IDs first
+    assignee = aliased(User)
+    reviewer = aliased(User)
+    query = select(Task, assignee.name, reviewer.name, Project.name).outerjoin(
+        assignee, assignee.id == Task.assigned_to_user_id
+    ).outerjoin(
+        reviewer, reviewer.id == Task.reviewer_id
+    ).outerjoin(
+        Project, Project.id == Task.project_id
+    ).where(Task.assigned_to_user_id == current_user.id)
     
     if status and status != "all":
-        query = query.filter(Task.status == status)
+        query = query.where(Task.status == status)
     
-    tasks = query.order_by(Task.created_at.desc()).all()
-    logger.info(f"Found {len(tasks)} tasks for user {current_user.id}")
+    query = query.order_by(Task.created_at.desc()).execution_options(yield_per=_TASK_STREAM_BATCH_SIZE)
     
-    result = []
-    for task in tasks:
+    async def stream_tasks():
+        # Server-side cursor, fetched _TASK_STREAM_BATCH_SIZE rows at a time; each task is encoded
+        # as soon as it arrives instead of building the whole list first
+        yield b"["
+        count = 0
         try:
-            # Get assigned user name
-            assigned_to_name = None
-            if task.assigned_to_user_id:
-                assigned_user = db.query(User).filter(User.id == task.assigned_to_user_id).first()
-                if assigned_user:
-                    assigned_to_name = assigned_user.name
-            
-            # Get reviewer name
-            reviewer_name = None
-            if getattr(task, 'reviewer_id', None):
-                reviewer = db.query(User).filter(User.id == task.reviewer_id).first()
-                if reviewer:
-                    reviewer_name = reviewer.name
-            
-            # Get project name
-            project = db.query(Project).filter(Project.id == task.project_id).first()
-            project_name = project.name if project else None
-            
-            task_dict = {
-                "id": str(task.id),
-                "project_id": task.project_id,
-                "task_type": task.task_type,
-                "title": task.title,
-                "description": getattr(task, 'description', None),
-                "raci_stage": getattr(task, 'raci_stage', None),
-                "raci_task_name": getattr(task, 'raci_task_name', None),
-                "assigned_to_user_id": task.assigned_to_user_id,
-                "assigned_to_name": assigned_to_name,
-                "reviewer_id": getattr(task, 'reviewer_id', None),
-                "reviewer_name": reviewer_name,
-                "required_role": getattr(task, 'required_role', None),
-                "estimated_time_hours": getattr(task, 'estimated_time_hours', None),
-                "actual_time_hours": getattr(task, 'actual_time_hours', None),
-                "status": task.status,
-                "priority": task.priority,
-                "due_at": getattr(task, 'due_at', None),
-                "created_at": task.created_at,
-                "completed_at": getattr(task, 'completed_at', None),
-                "verified_at": getattr(task, 'verified_at', None),
-                "verified_by": getattr(task, 'verified_by', None),
-                "is_blocking": getattr(task, 'is_blocking', False)
-            }
-            task_read = TaskRead.model_validate(task_dict)
-            task_read_dict = task_read.model_dump()
-            task_read_dict["project_name"] = project_name
-            result.append(task_read_dict)
-        except Exception as e:
-            logger.error(f"Error converting task {task.id}: {e}")
-            continue
-    
-    return result
+            async for task, assigned_to_name, reviewer_name, project_name in await db.stream(query):
+                try:
+                    task_dict = {
+                        "id": str(task.id),
+                        "project_id": task.project_id,
+                        "task_type": task.task_type,
+                        "title": task.title,
+                        "description": getattr(task, 'description', None),
+                        "raci_stage": getattr(task, 'raci_stage', None),
+                        "raci_task_name": getattr(task, 'raci_task_name', None),
+                        "assigned_to_user_id": task.assigned_to_user_id,
+                        "assigned_to_name": assigned_to_name,
+                        "reviewer_id": getattr(task, 'reviewer_id', None),
+                        "reviewer_name": reviewer_name,
+                        "required_role": getattr(task, 'required_role', None),
+                        "estimated_time_hours": getattr(task, 'estimated_time_hours', None),
+                        "actual_time_hours": getattr(task, 'actual_time_hours', None),
+                        "status": task.status,
+                        "priority": task.priority,
+                        "due_at": getattr(task, 'due_at', None),
+                        "created_at": task.created_at,
+                        "completed_at": getattr(task, 'completed_at', None),
+                        "verified_at": getattr(task, 'verified_at', None),
+                        "verified_by": getattr(task, 'verified_by', None),
+                        "is_blocking": getattr(task, 'is_blocking', False),
+                        "project_name": project_name
+                    }
+                except Exception as e:
+                    logger.error(f"Error converting task {task.id}: {e}")
+                    continue
+                # Columns already have TaskRead's types, so each dict goes straight to orjson
+                yield (b"," if count else b"") + orjson.dumps(task_dict)
+                count += 1
+        except Exception:
+            # Headers (200) are already sent: the client only sees a truncated body, so log it here
+            logger.exception("Task stream for user %s failed after %d tasks", current_user.id, count)
+            raise
+        yield b"]"
+        logger.info("Returned %d tasks for user %s", count, current_user.id)
+    
+    return StreamingResponse(stream_tasks(), media_type="application/json")
 
 
 @router.get("", response_model=list[ProjectRead])
-def list_projects(db: Session = Depends(get_db), current_user=Depends(get_current_active_user)):
+async def list_projects(db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_active_user)):
     """List all projects (for admin)"""
     try:
-        projects = db.query(Project).all()
-        result = []
-        for p in projects:
-            try:
-                # Try to use model_validate directly from SQLAlchemy object
-                # This works because ProjectRead has from_attributes=True
-                project_read = ProjectRead.model_validate(p)
-                result.append(project_read)
-            except Exception as e:
-                # If model_validate fails (e.g., missing column), create manually
-                import traceback
-                print(f"Error converting project {p.id} with model_validate: {e}")
-                try:
-                    # Manual construction with safe attribute access
-                    project_read = ProjectRead(
-                        id=p.id,
-                        org_id=p.org_id,
-                        folder_id=getattr(p, 'folder_id', None),
-                        key=p.key,
-                        name=p.name,
-                        status=p.status,
-                        retention_policy_json=getattr(p, 'retention_policy_json', None),
-                        raci_matrix_json=getattr(p, 'raci_matrix_json', None),
-                        created_at=p.created_at
-                    )
-                    result.append(project_read)
-                except Exception as e2:
-                    print(f"Failed to create ProjectRead for {p.id}: {e2}")
-                    print(traceback.format_exc())
-                    # Skip this project if we can't convert it
-                    continue
-        return result
+        rows = (await db.execute(select(*_PROJECT_READ_COLUMNS))).all()
+        # Values come straight from the DB row, so skip Pydantic validation
+        result = [_project_read(row) for row in rows]
+        # Encode the already-built rows with orjson directly instead of re-validating them
+        # against response_model
+        return ORJSONResponse([project_read.model_dump() for project_read in result])
     except Exception as e:
-        import traceback
         error_msg = f"Error listing projects: {str(e)}"
-        print(error_msg)
-        print(traceback.format_exc())
+        logger.error(error_msg, exc_info=True)
         raise HTTPException(status_code=500, detail=error_msg)
 
 
 @router.post("", response_model=ProjectRead)
-def create_project(
-    payload: ProjectCreate, db: Session = Depends(get_db), current_user=Depends(get_current_active_user)
+async def create_project(
+    payload: ProjectCreate, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_active_user)
 ):
-    from app.models import Org
-    # Get or create default org if org_id not provided
+    # Get or create default org if org_id not provided (ID cached per process after first lookup)
     if not payload.org_id:
-        default_org = db.query(Org).first()
-        if not default_org:
-            import uuid
-            default_org = Org(id=uuid.uuid4(), name="Default Organization")
-            db.add(default_org)
-            db.commit()
-            db.refresh(default_org)
-        org_id = default_org.id
+        org_id = await get_default_org_id_async(db, create=True)
     else:
         org_id = payload.org_id
     
     # Validate folder_id if provided
     folder_id = payload.folder_id
     if folder_id:
-        from app.models import ProjectFolder
-        folder = db.query(ProjectFolder).filter(ProjectFolder.id == folder_id).first()
+        folder = await db.get(ProjectFolder, folder_id)
         if not folder:
             raise HTTPException(status_code=404, detail="Folder not found")
         if folder.org_id != org_id:
@@ -238,7 +265,9 @@ def create_project(
             ]
         }
     
+    # Client-side ID so memberships can reference the project without flushing it first
     project = Project(
+        id=uuid4(),
         org_id=org_id,
         folder_id=folder_id,
         key=payload.key,
@@ -247,13 +276,8 @@ def create_project(
         retention_policy_json=payload.retention_policy_json,
         raci_matrix_json=raci_matrix_json
     )
-    db.add(project)
-    db.flush()  # Flush to get project.id
     
     # Automatically add creator as Business Owner member
-    from app.models import ProjectMember
-    from app.core.enums import RoleCode
-    
     creator_member = ProjectMember(
         project_id=project.id,
         user_id=current_user.id,
@@ -262,17 +286,15 @@ def create_project(
         expires_at=None,
         invited_by=current_user.id
     )
-    db.add(creator_member)
+    db.add_all([project, creator_member])
+    member_user_ids = {current_user.id}
     
     # Helper function to invite user (avoid duplicates)
     def invite_user_if_not_exists(user_id, role_code: str):
-        """Invite user to project if not already a member with this role"""
-        existing = db.query(ProjectMember).filter(
-            ProjectMember.project_id == project.id,
-            ProjectMember.user_id == user_id,
-            ProjectMember.role_code == role_code
-        ).first()
-        if not existing:
+        """Invite user to project if not already a member"""
+        # The project is new, so its only members are the ones added in this request;
+        # (project_id, user_id) is unique, so the first role given to a user wins
+        if user_id not in member_user_ids:
             member = ProjectMember(
                 project_id=project.id,
                 user_id=user_id,
@@ -282,6 +304,7 @@ def create_project(
                 invited_by=current_user.id
             )
             db.add(member)
+            member_user_ids.add(user_id)
             logger.info(f"Invited user {user_id} with role {role_code} to project {project.id}")
     
     # Invite Document Creators from required document types
@@ -293,7 +316,6 @@ def create_project(
         
         for creator_id_str in document_creator_ids:
             try:
-                from uuid import UUID
                 creator_id = UUID(creator_id_str) if isinstance(creator_id_str, str) else creator_id_str
                 invite_user_if_not_exists(creator_id, "Business Owner")
             except Exception as e:
@@ -310,7 +332,6 @@ def create_project(
         
         for user_id_str, role_code in user_ids_to_invite:
             try:
-                from uuid import UUID
                 user_id = UUID(user_id_str) if isinstance(user_id_str, str) else user_id_str
                 invite_user_if_not_exists(user_id, role_code)
             except Exception as e:
@@ -320,49 +341,40 @@ def create_project(
     if payload.invited_users:
         for invite_data in payload.invited_users:
             try:
-                from uuid import UUID
                 user_id = UUID(invite_data["user_id"]) if isinstance(invite_data["user_id"], str) else invite_data["user_id"]
                 role_code = invite_data.get("role_code", "SME")
                 invite_user_if_not_exists(user_id, role_code)
             except Exception as e:
                 logger.warning(f"Failed to invite user from invited_users list: {e}")
     
-    db.commit()
-    db.refresh(project)
+    # Single commit; the in-memory project already holds every column (no refresh round-trip)
+    await db.commit()
+    # New memberships may add an org to these users' cached org IDs and project lists
+    await invalidate_user_org_ids_async(*member_user_ids)
+    await invalidate_my_projects_async(*member_user_ids)
     
     logger.info(f"Created project {project.id} and added creator {current_user.id} as member")
     return project
 
 
 @router.get("/{project_id}", response_model=ProjectRead)
-def get_project(
-    project_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_active_user)
+async def get_project(
+    project_id: UUID, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_active_user)
 ):
-    from uuid import UUID
-    try:
-        project_uuid = UUID(project_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid project ID format")
-    project = db.query(Project).filter(Project.id == project_uuid).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
 
 
 @router.put("/{project_id}", response_model=ProjectRead)
-def update_project(
-    project_id: str,
+async def update_project(
+    project_id: UUID,
     payload: ProjectUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user),
 ):
-    from uuid import UUID
-    try:
-        project_uuid = UUID(project_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid project ID format")
-    
-    project = db.query(Project).filter(Project.id == project_uuid).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -377,109 +389,109 @@ def update_project(
         project.raci_matrix_json = payload.raci_matrix_json
     # Note: approval_policies_json and escalation_chain_json may not be in model yet
     # but we accept them in schema for future use
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
+    await _invalidate_project_reads(db, project_id)
     return project
 
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_project(
-    project_id: str,
-    db: Session = Depends(get_db),
+async def delete_project(
+    project_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user),
 ):
-    from uuid import UUID
-    from app.models import ProjectMember
-    from app.models.entities import Task
     
-    try:
-        project_uuid = UUID(project_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid project ID format")
-    
-    project = db.query(Project).filter(Project.id == project_uuid).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Delete related records first (if cascade doesn't handle it)
-    # Delete project members
-    db.query(ProjectMember).filter(ProjectMember.project_id == project_uuid).delete()
+    # Members' user IDs are only needed to drop their cached memberships afterwards
+    member_user_ids = (await db.scalars(
+        select(ProjectMember.user_id).where(ProjectMember.project_id == project_id)
+    )).all()
     
-    # Delete tasks
-    db.query(Task).filter(Task.project_id == project_uuid).delete()
+    # Members and tasks are removed by ON DELETE CASCADE (passive_deletes: nothing is loaded first)
+    await db.delete(project)
+    await db.commit()
     
-    # Delete project
-    db.delete(project)
-    db.commit()
+    for member_user_id in member_user_ids:
+        await invalidate_membership_cache_async(project_id, member_user_id)
     
-    logger.info(f"Project {project_uuid} deleted by user {current_user.id}")
+    logger.info(f"Project {project_id} deleted by user {current_user.id}")
     return None
 
 
 @router.get("/{project_id}/raci", response_model=dict)
-def get_project_raci(
-    project_id: str, db: Session = Depends(get_db), current_user=Depends(get_current_active_user)
+async def get_project_raci(
+    project_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_active_user),
 ):
-    """Get RACI matrix for a project"""
-    from uuid import UUID
-    from app.models import ProjectMember, User
-    from app.schemas.auth import UserRead
+    """Get RACI matrix for a project. Supports If-None-Match (ETag of the response body)."""
     
-    try:
-        project_uuid = UUID(project_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid project ID format")
+    # Includes the team: only cached when the cache is shared, so a removal reaches every worker
+    cache_key = raci_cache_key(project_id)
+    use_cache = cache_is_shared()
+    cached = await cache_get_async(cache_key) if use_cache else None
+    if cached is not None:
+        return _json_response(request, cached)
     
-    project = db.query(Project).filter(Project.id == project_uuid).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    team_members_dict = _get_team_members_dict(project_uuid, db)
+    team_members_dict = await _get_team_members_dict_async(project_id, db)
     
     # Get stored RACI matrix or return default
     if project.raci_matrix_json:
-        raci_matrix = project.raci_matrix_json.copy()
-        # Ensure role_assignments exists
-        if "role_assignments" not in raci_matrix:
-            raci_matrix["role_assignments"] = {}
-        return {
-            "project_id": str(project_uuid),
-            "raci_matrix": raci_matrix,
+        # Read-only: share the stored structure, only overlaying role_assignments when it's missing
+        raci_matrix = project.raci_matrix_json
+        result = {
+            "project_id": str(project_id),
+            "raci_matrix": {**raci_matrix, "role_assignments": raci_matrix.get("role_assignments", {})},
+            "team_members": team_members_dict
+        }
+    else:
+        # Return default RACI matrix if not set (read-only here, so share the constant's stages)
+        default_raci = {**_DEFAULT_RACI_MATRIX, "role_assignments": {}}
+        result = {
+            "project_id": str(project_id),
+            "raci_matrix": default_raci,  # This is already { "stages": [...], "role_assignments": {} }
             "team_members": team_members_dict
         }
     
-    # Return default RACI matrix if not set
-    default_raci = _get_default_raci_matrix()
-    default_raci["role_assignments"] = {}
-    return {
-        "project_id": str(project_uuid),
-        "raci_matrix": default_raci,  # This is already { "stages": [...], "role_assignments": {} }
-        "team_members": team_members_dict
-    }
+    # team_members holds UserRead models; orjson encodes them via model_dump
+    body = orjson.dumps(result, default=lambda obj: obj.model_dump()).decode()
+    if use_cache:
+        await cache_set_async(cache_key, body, ttl=RACI_CACHE_TTL)
+    return _json_response(request, body)
 
 
-def _get_team_members_dict(project_uuid, db):
-    """Get team members as dict for RACI matrix"""
-    from datetime import datetime
-    from sqlalchemy import or_
-    from app.models import ProjectMember, User
-    from app.schemas.auth import UserRead
+def _team_members_query(project_uuid):
+    """Active (non-expired) members of a project, with their users joined in"""
     
-    members = db.query(ProjectMember).filter(
+    # joinedload: users come back in the same statement instead of one query per member
+    return select(ProjectMember).options(joinedload(ProjectMember.user)).where(
         ProjectMember.project_id == project_uuid
-    ).filter(
+    ).where(
         or_(
             ProjectMember.expires_at.is_(None),
-            ProjectMember.expires_at > datetime.utcnow()
+            ProjectMember.expires_at > utcnow()
         )
-    ).all()
+    )
+
+
+def _build_team_members_dict(members):
+    """Team members keyed by role code, as returned with the RACI matrix"""
     
     result = {}
     for member in members:
-        user = db.query(User).filter(User.id == member.user_id).first()
+        user = member.user
         if user:
             result[member.role_code] = {
-                "user": UserRead.model_validate(user),
+                "user": UserRead.model_construct(id=user.id, email=user.email, name=user.name, is_active=user.is_active),
                 "role_code": member.role_code,
                 "is_temporary": member.is_temporary,
                 "expires_at": member.expires_at.isoformat() if member.expires_at else None
@@ -487,183 +499,252 @@ def _get_team_members_dict(project_uuid, db):
     return result
 
 
-def _get_default_raci_matrix():
-    """Get default RACI matrix structure"""
+def _decode_team_members(cached):
+    """Team members dict from its cached JSON (users rebuilt as UserRead), or None on a miss"""
+    if cached is None:
+        return None
     return {
-        "stages": [
-            {
-                "stage": "Discovery",
-                "tasks": [
-                    {
-                        "task": "Automation Brief",
-                        "roles": {
-                            "Process Owner": "A",
-                            "SME": "A",
-                            "Business Analyst": "A",
-                            "Project Manager": "A"
-                        }
-                    },
-                    {
-                        "task": "TG 1",
-                        "roles": {
-                            "Process Owner": "R",
-                            "App Owner": "R",
-                            "Project Manager": "R",
-                            "Solution Architect": "R"
-                        }
+        role_code: {**member, "user": UserRead.model_construct(**{**member["user"], "id": UUID(member["user"]["id"])})}
+        for role_code, member in orjson.loads(cached).items()
+    }
+
+
+def _encode_team_members(team_members) -> str:
+    return orjson.dumps(team_members, default=lambda obj: obj.model_dump()).decode()
+
+
+def _get_team_members_dict(project_uuid, db):
+    """
+    Get team members as dict for RACI matrix (cached briefly; dropped when a membership changes).
+    Tasks are assigned from it, so it is only cached when the cache is shared across workers.
+    """
+    cache_key = team_members_cache_key(project_uuid)
+    use_cache = cache_is_shared()
+    team_members = _decode_team_members(cache_get(cache_key)) if use_cache else None
+    if team_members is None:
+        team_members = _build_team_members_dict(db.scalars(_team_members_query(project_uuid)).unique().all())
+        if use_cache:
+            cache_set(cache_key, _encode_team_members(team_members), ttl=TEAM_MEMBERS_CACHE_TTL)
+    return team_members
+
+
+async def _get_team_members_dict_async(project_uuid, db):
+    """Async variant of _get_team_members_dict for AsyncSession routes (non-blocking cache calls)"""
+    cache_key = team_members_cache_key(project_uuid)
+    use_cache = cache_is_shared()
+    team_members = _decode_team_members(await cache_get_async(cache_key)) if use_cache else None
+    if team_members is None:
+        team_members = _build_team_members_dict((await db.scalars(_team_members_query(project_uuid))).unique().all())
+        if use_cache:
+            await cache_set_async(cache_key, _encode_team_members(team_members), ttl=TEAM_MEMBERS_CACHE_TTL)
+    return team_members
+
+
+# Built once at import; _get_default_raci_matrix() hands out deep copies for callers that mutate it
+_DEFAULT_RACI_MATRIX = {
+    "stages": [
+        {
+            "stage": "Discovery",
+            "tasks": [
+                {
+                    "task": "Automation Brief",
+                    "roles": {
+                        "Process Owner": "A",
+                        "SME": "A",
+                        "Business Analyst": "A",
+                        "Project Manager": "A"
                     }
-                ]
-            },
-            {
-                "stage": "Design",
-                "tasks": [
-                    {
-                        "task": "PDD",
-                        "roles": {
-                            "Process Owner": "A",
-                            "SME": "A",
-                            "Business Analyst": "R",
-                            "Project Manager": "A",
-                            "Junior Developer": "I",
-                            "Regular Developer": "I",
-                            "Senior Developer": "I",
-                            "Solution Architect": "I"
-                        }
-                    },
-                    {
-                        "task": "SDD",
-                        "roles": {
-                            "App Owner": "I",
-                            "Project Manager": "A",
-                            "Junior Developer": "I",
-                            "Regular Developer": "R",
-                            "Senior Developer": "R",
-                            "Solution Architect": "A"
-                        }
-                    },
-                    {
-                        "task": "Development Infra Set-up",
-                        "roles": {
-                            "Process Owner": "I",
-                            "App Owner": "R",
-                            "Project Manager": "A",
-                            "Junior Developer": "I",
-                            "Regular Developer": "I",
-                            "Solution Architect": "R"
-                        }
-                    },
-                    {
-                        "task": "TG2",
-                        "roles": {
-                            "Project Manager": "A",
-                            "Junior Developer": "R",
-                            "Regular Developer": "R",
-                            "Senior Developer": "A",
-                            "Solution Architect": "A"
-                        }
-                    },
-                    {
-                        "task": "UAT/Prod Infra Set-up",
-                        "roles": {
-                            "App Owner": "R",
-                            "Project Manager": "A",
-                            "Junior Developer": "I",
-                            "Regular Developer": "I",
-                            "Solution Architect": "R",
-                            "Operator": "I"
-                        }
+                },
+                {
+                    "task": "TG 1",
+                    "roles": {
+                        "Process Owner": "R",
+                        "App Owner": "R",
+                        "Project Manager": "R",
+                        "Solution Architect": "R"
                     }
-                ]
-            },
-            {
-                "stage": "Implementation",
-                "tasks": [
-                    {
-                        "task": "Configuration",
-                        "roles": {
-                            "Project Manager": "R",
-                            "Junior Developer": "A",
-                            "Regular Developer": "A",
-                            "Senior Developer": "A",
-                            "Solution Architect": "R"
-                        }
-                    },
-                    {
-                        "task": "Unit Testing",
-                        "roles": {
-                            "Junior Developer": "R",
-                            "Regular Developer": "R",
-                            "Senior Developer": "A",
-                            "Solution Architect": "A",
-                            "Operator": "I"
-                        }
-                    },
-                    {
-                        "task": "UAT/TG3",
-                        "roles": {
-                            "Process Owner": "R",
-                            "App Owner": "I",
-                            "SME": "R",
-                            "Business Analyst": "R",
-                            "Project Manager": "A",
-                            "Junior Developer": "A",
-                            "Regular Developer": "A",
-                            "Senior Developer": "A",
-                            "Solution Architect": "A"
-                        }
+                }
+            ]
+        },
+        {
+            "stage": "Design",
+            "tasks": [
+                {
+                    "task": "PDD",
+                    "roles": {
+                        "Process Owner": "A",
+                        "SME": "A",
+                        "Business Analyst": "R",
+                        "Project Manager": "A",
+                        "Junior Developer": "I",
+                        "Regular Developer": "I",
+                        "Senior Developer": "I",
+                        "Solution Architect": "I"
                     }
-                ]
-            },
-            {
-                "stage": "Run",
-                "tasks": [
-                    {
-                        "task": "Robot Monitoring",
-                        "roles": {
-                            "Solution Architect": "I",
-                            "Operator": "A"
-                        }
-                    },
-                    {
-                        "task": "Incident Mngt",
-                        "roles": {
-                            "Solution Architect": "I",
-                            "Operator": "A"
-                        }
-                    },
-                    {
-                        "task": "Application Change Control",
-                        "roles": {
-                            "Process Owner": "R",
-                            "App Owner": "R",
-                            "SME": "R",
-                            "Business Analyst": "A",
-                            "Solution Architect": "I",
-                            "Operator": "I"
-                        }
+                },
+                {
+                    "task": "SDD",
+                    "roles": {
+                        "App Owner": "I",
+                        "Project Manager": "A",
+                        "Junior Developer": "I",
+                        "Regular Developer": "R",
+                        "Senior Developer": "R",
+                        "Solution Architect": "A"
                     }
-                ]
-            }
-        ]
-    }
+                },
+                {
+                    "task": "Development Infra Set-up",
+                    "roles": {
+                        "Process Owner": "I",
+                        "App Owner": "R",
+                        "Project Manager": "A",
+                        "Junior Developer": "I",
+                        "Regular Developer": "I",
+                        "Solution Architect": "R"
+                    }
+                },
+                {
+                    "task": "TG2",
+                    "roles": {
+                        "Project Manager": "A",
+                        "Junior Developer": "R",
+                        "Regular Developer": "R",
+                        "Senior Developer": "A",
+                        "Solution Architect": "A"
+                    }
+                },
+                {
+                    "task": "UAT/Prod Infra Set-up",
+                    "roles": {
+                        "App Owner": "R",
+                        "Project Manager": "A",
+                        "Junior Developer": "I",
+                        "Regular Developer": "I",
+                        "Solution Architect": "R",
+                        "Operator": "I"
+                    }
+                }
+            ]
+        },
+        {
+            "stage": "Implementation",
+            "tasks": [
+                {
+                    "task": "Configuration",
+                    "roles": {
+                        "Project Manager": "R",
+                        "Junior Developer": "A",
+                        "Regular Developer": "A",
+                        "Senior Developer": "A",
+                        "Solution Architect": "R"
+                    }
+                },
+                {
+                    "task": "Unit Testing",
+                    "roles": {
+                        "Junior Developer": "R",
+                        "Regular Developer": "R",
+                        "Senior Developer": "A",
+                        "Solution Architect": "A",
+                        "Operator": "I"
+                    }
+                },
+                {
+                    "task": "UAT/TG3",
+                    "roles": {
+                        "Process Owner": "R",
+                        "App Owner": "I",
+                        "SME": "R",
+                        "Business Analyst": "R",
+                        "Project Manager": "A",
+                        "Junior Developer": "A",
+                        "Regular Developer": "A",
+                        "Senior Developer": "A",
+                        "Solution Architect": "A"
+                    }
+                }
+            ]
+        },
+        {
+            "stage": "Run",
+            "tasks": [
+                {
+                    "task": "Robot Monitoring",
+                    "roles": {
+                        "Solution Architect": "I",
+                        "Operator": "A"
+                    }
+                },
+                {
+                    "task": "Incident Mngt",
+                    "roles": {
+                        "Solution Architect": "I",
+                        "Operator": "A"
+                    }
+                },
+                {
+                    "task": "Application Change Control",
+                    "roles": {
+                        "Process Owner": "R",
+                        "App Owner": "R",
+                        "SME": "R",
+                        "Business Analyst": "A",
+                        "Solution Architect": "I",
+                        "Operator": "I"
+                    }
+                }
+            ]
+        }
+    ]
+}
+
+
+def _get_default_raci_matrix():
+    """Get a mutable copy of the default RACI matrix structure"""
+    return copy.deepcopy(_DEFAULT_RACI_MATRIX)
+
+
+@functools.lru_cache(maxsize=128)
+def _flatten_raci_json(raci_matrix_json: bytes) -> dict:
+    """(stage, task, role) -> RACI value for an encoded RACI matrix; callers must not mutate the result"""
+    raci_mapping = {}
+    for stage in orjson.loads(raci_matrix_json).get("stages", []):
+        stage_name = stage.get("stage")
+        for raci_task in stage.get("tasks", []):
+            task_name = raci_task.get("task")
+            for role, raci_value in raci_task.get("roles", {}).items():
+                raci_mapping[(stage_name, task_name, role)] = raci_value
+    return raci_mapping
+
+
+def _raci_mapping(raci_matrix) -> dict:
+    """
+    Flattened (stage, task, role) -> RACI value mapping, memoized on the matrix's encoded JSON so
+    repeated calls for an unchanged matrix (or the default one) skip the nested walk.
+    """
+    return _flatten_raci_json(orjson.dumps(raci_matrix))
+
+
+def _copy_raci_matrix(raci_matrix):
+    """
+    Deep copy of a stored RACI matrix for in-place edits (JSON-only data, so an orjson round-trip
+    is enough and much faster than copy.deepcopy). Assigning the copy back is what lets
+    SQLAlchemy see the change; mutating the loaded dict itself would not be detected.
+    """
+    return orjson.loads(orjson.dumps(raci_matrix))
 
 
 @router.put("/{project_id}/raci", response_model=dict)
-def update_project_raci(
-    project_id: str,
+async def update_project_raci(
+    project_id: UUID,
     payload: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user),
 ):
     """Update RACI matrix for a project"""
-    from uuid import UUID
-    
-    try:
-        project_uuid = UUID(project_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid project ID format")
     
-    project = db.query(Project).filter(Project.id == project_uuid).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -673,46 +754,126 @@ def update_project_raci(
     
     project.raci_matrix_json = payload["raci_matrix_json"]
     db.add(project)
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
+    await _invalidate_project_reads(db, project_id)
     
     return {
-        "project_id": str(project_uuid),
+        "project_id": str(project_id),
         "raci_matrix": project.raci_matrix_json,
-        "team_members": _get_team_members_dict(project_uuid, db)
+        "team_members": await _get_team_members_dict_async(project_id, db)
     }
 
 
+# First (stage, task) match inside raci_matrix_json, with its array positions - same order the
+# Python scan used (stages, then tasks within a stage)
+_RACI_TASK_LOCATE = """
+    SELECT s.ord - 1 AS si, t.ord - 1 AS ti, t.value AS task
+    FROM projects src,
+         jsonb_array_elements(src.raci_matrix_json -> 'stages') WITH ORDINALITY AS s(value, ord),
+         jsonb_array_elements(s.value -> 'tasks') WITH ORDINALITY AS t(value, ord)
+    WHERE src.id = :project_id AND s.value ->> 'stage' = :stage AND t.value ->> 'task' = :task
+    ORDER BY s.ord, t.ord
+    LIMIT 1
+"""
+
+# Merge :patch into the matched task in place (jsonb_set), optionally dropping due_date
+_RACI_TASK_STATUS_UPDATE = text(f"""
+    WITH loc AS ({_RACI_TASK_LOCATE})
+    UPDATE projects p
+    SET raci_matrix_json = jsonb_set(
+        p.raci_matrix_json,
+        ARRAY['stages', CAST(loc.si AS text), 'tasks', CAST(loc.ti AS text)],
+        CASE WHEN :drop_due_date
+            THEN (loc.task || CAST(:patch AS jsonb)) - 'due_date'
+            ELSE loc.task || CAST(:patch AS jsonb)
+        END
+    )
+    FROM loc
+    WHERE p.id = :project_id
+    RETURNING loc.si
+""")
+
+# Append :escalation (plus the task's R/A roles) to the matched task's escalations; no-op if the
+# task has no R/A roles
+_RACI_TASK_ESCALATE = text(f"""
+    WITH loc AS ({_RACI_TASK_LOCATE}),
+    esc AS (
+        SELECT loc.si, loc.ti, loc.task, (
+            SELECT jsonb_agg(r.key ORDER BY r.ord)
+            FROM jsonb_each_text(loc.task -> 'roles') WITH ORDINALITY AS r(key, value, ord)
+            WHERE r.value IN ('R', 'A')
+        ) AS escalated_to_roles
+        FROM loc
+    )
+    UPDATE projects p
+    SET raci_matrix_json = jsonb_set(
+        p.raci_matrix_json,
+        ARRAY['stages', CAST(esc.si AS text), 'tasks', CAST(esc.ti AS text)],
+        esc.task || jsonb_build_object(
+            'escalations', COALESCE(esc.task -> 'escalations', CAST('[]' AS jsonb)) || jsonb_build_array(
+                CAST(:escalation AS jsonb) || jsonb_build_object('escalated_to_roles', esc.escalated_to_roles)
+            ),
+            'escalated', true
+        )
+    )
+    FROM esc
+    WHERE p.id = :project_id AND esc.escalated_to_roles IS NOT NULL
+    RETURNING esc.task -> 'roles' AS roles
+""").columns(roles=JSONB)
+
+
 @router.put("/{project_id}/raci/task-status", response_model=dict)
-def update_raci_task_status(
-    project_id: str,
+async def update_raci_task_status(
+    project_id: UUID,
     payload: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user),
 ):
     """Update status and progress of a task in RACI matrix"""
-    from uuid import UUID
-    
-    try:
-        project_uuid = UUID(project_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid project ID format")
-    
-    project = db.query(Project).filter(Project.id == project_uuid).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
     
     stage_name = payload.get("stage")
     task_name = payload.get("task")
     status = payload.get("status")  # 'not_started' | 'in_progress' | 'completed' | 'blocked'
     progress = payload.get("progress", 0)  # 0-100
     due_date = payload.get("due_date")  # ISO date string or None
+    result = {
+        "project_id": str(project_id),
+        "stage": stage_name,
+        "task": task_name,
+        "status": status,
+        "progress": progress,
+        "due_date": due_date
+    }
+    
+    # Patch the task inside the stored matrix with one UPDATE - no round-trip of the whole
+    # JSON document and no Python scan
+    if stage_name and task_name:
+        patch = {"status": status, "progress": max(0, min(100, progress))}
+        if due_date:
+            patch["due_date"] = due_date
+        updated = (await db.execute(_RACI_TASK_STATUS_UPDATE, {
+            "project_id": project_id,
+            "stage": stage_name,
+            "task": task_name,
+            "patch": orjson.dumps(patch).decode(),
+            "drop_due_date": due_date is None,
+        })).first()
+        if updated:
+            await db.commit()
+            await _invalidate_project_reads(db, project_id)
+            return result
+    
+    # Nothing patched: missing project/task, or no stored matrix yet (starts from the default)
+    project = await db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
     
     if not stage_name or not task_name:
         raise HTTPException(status_code=400, detail="stage and task are required")
     
-    # Get current RACI matrix
-    raci_matrix = project.raci_matrix_json or _get_default_raci_matrix()
+    # Get current RACI matrix (a copy: it's edited below and assigned back)
+    raci_matrix = _copy_raci_matrix(project.raci_matrix_json) if project.raci_matrix_json else _get_default_raci_matrix()
     
     # Find and update the task
     task_found = False
@@ -737,49 +898,76 @@ def update_raci_task_status(
     # Save updated RACI matrix
     project.raci_matrix_json = raci_matrix
     db.add(project)
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
+    await _invalidate_project_reads(db, project_id)
     
-    return {
-        "project_id": str(project_uuid),
-        "stage": stage_name,
-        "task": task_name,
-        "status": status,
-        "progress": progress,
-        "due_date": due_date
-    }
+    return result
 
 
 @router.post("/{project_id}/raci/escalate", response_model=dict)
-def escalate_raci_task(
-    project_id: str,
+async def escalate_raci_task(
+    project_id: UUID,
     payload: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user),
 ):
     """Escalate a task in RACI matrix to accountable/responsible roles"""
-    from uuid import UUID
-    from datetime import datetime
-    
-    try:
-        project_uuid = UUID(project_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid project ID format")
-    
-    project = db.query(Project).filter(Project.id == project_uuid).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
     
     stage_name = payload.get("stage")
     task_name = payload.get("task")
     reason = payload.get("reason", "")
     level = payload.get("level", 1)  # Escalation level
+    triggered_at = utcnow().isoformat()
+    
+    # Append the escalation inside the stored matrix with one UPDATE; the task's roles come back
+    # so the response can list the escalated R/A roles
+    if stage_name and task_name:
+        escalated = (await db.execute(_RACI_TASK_ESCALATE, {
+            "project_id": project_id,
+            "stage": stage_name,
+            "task": task_name,
+            "escalation": orjson.dumps({
+                "level": level,
+                "triggered_at": triggered_at,
+                "triggered_by": str(current_user.id),
+                "reason": reason
+            }).decode(),
+        })).first()
+        if escalated:
+            await db.commit()
+            await _invalidate_project_reads(db, project_id)
+            escalated_roles = [
+                {"role": role, "raci_type": raci_value, "level": level}
+                for role, raci_value in escalated.roles.items()
+                if raci_value in ["R", "A"]
+            ]
+            escalation = {
+                "level": level,
+                "escalated_to_roles": [r["role"] for r in escalated_roles],
+                "triggered_at": triggered_at,
+                "triggered_by": str(current_user.id),
+                "reason": reason
+            }
+            return {
+                "project_id": str(project_id),
+                "stage": stage_name,
+                "task": task_name,
+                "escalation": escalation,
+                "escalated_to_roles": escalated_roles,
+                "team_members": await _get_team_members_dict_async(project_id, db)
+            }
+    
+    # Nothing escalated: missing project/task, no R/A roles, or no stored matrix yet (default)
+    project = await db.get(Project, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
     
     if not stage_name or not task_name:
         raise HTTPException(status_code=400, detail="stage and task are required")
     
-    # Get current RACI matrix
-    raci_matrix = project.raci_matrix_json or _get_default_raci_matrix()
+    # Get current RACI matrix (a copy: it's edited below and assigned back)
+    raci_matrix = _copy_raci_matrix(project.raci_matrix_json) if project.raci_matrix_json else _get_default_raci_matrix()
     
     # Find the task
     task = None
@@ -819,7 +1007,7 @@ def escalate_raci_task(
     escalation = {
         "level": level,
         "escalated_to_roles": [r["role"] for r in escalated_roles],
-        "triggered_at": datetime.utcnow().isoformat(),
+        "triggered_at": triggered_at,
         "triggered_by": str(current_user.id),
         "reason": reason
     }
@@ -829,14 +1017,15 @@ def escalate_raci_task(
     # Save updated RACI matrix
     project.raci_matrix_json = raci_matrix
     db.add(project)
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
+    await _invalidate_project_reads(db, project_id)
     
     # Get team members for notification
-    team_members = _get_team_members_dict(project_uuid, db)
+    team_members = await _get_team_members_dict_async(project_id, db)
     
     return {
-        "project_id": str(project_uuid),
+        "project_id": str(project_id),
         "stage": stage_name,
         "task": task_name,
         "escalation": escalation,
@@ -846,148 +1035,94 @@ def escalate_raci_task(
 
 
 # Tasks endpoints
-@router.get("/{project_id}/tasks", response_model=list[TaskRead])
-def list_project_tasks(
-    project_id: str,
+# Streamed hand-encoded JSON: the schema is documented, not validated per response
+@router.get("/{project_id}/tasks", responses={200: {"model": list[TaskRead]}})
+async def list_project_tasks(
+    project_id: UUID,
     stage: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_active_user),
 ):
     """List tasks for a project with optional filters"""
-    from uuid import UUID
-    from app.models.entities import Task, User
-    from app.schemas.tasks import TaskRead
-    import logging
-    
-    logger = logging.getLogger(__name__)
     
-    try:
-        project_uuid = UUID(project_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid project ID format")
     
     # Check if project exists
-    project = db.query(Project).filter(Project.id == project_uuid).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Debug: Check all tasks in database for this project
-    # Use expire_all to ensure we get fresh data from database
-    db.expire_all()
-    all_tasks = db.query(Task).filter(Task.project_id == project_uuid).all()
-    logger.info(f"DEBUG: Found {len(all_tasks)} tasks in database for project {project_id}")
-    print(f"DEBUG: Found {len(all_tasks)} tasks in database for project {project_id}")
-    print(f"DEBUG: Project UUID: {project_uuid}")
-    if all_tasks:
-        print(f"DEBUG: First task ID: {all_tasks[0].id}, title: {all_tasks[0].title}, project_id: {all_tasks[0].project_id}")
-    else:
-        # Try to find any tasks at all
-        any_tasks = db.query(Task).limit(5).all()
-        print(f"DEBUG: No tasks found for this project. Total tasks in database: {db.query(Task).count()}")
-        if any_tasks:
-            print(f"DEBUG: Sample task project_id: {any_tasks[0].project_id}")
-    
-    query = db.query(Task).filter(Task.project_id == project_uuid)
+    # Only TaskRead's columns as plain rows (no ORM Task instances); assignee/reviewer names come
+    # from outer joins in the same SELECT
+    assignee = aliased(User)
+    reviewer = aliased(User)
+    query = select(
+        Task.id,
+        Task.project_id,
+        Task.task_type,
+        Task.title,
+        Task.description,
+        Task.raci_stage,
+        Task.raci_task_name,
+        Task.assigned_to_user_id,
+        assignee.name.label("assigned_to_name"),
+        Task.reviewer_id,
+        reviewer.name.label("reviewer_name"),
+        Task.required_role,
+        Task.estimated_time_hours,
+        Task.actual_time_hours,
+        Task.status,
+        Task.priority,
+        Task.due_at,
+        Task.created_at,
+        Task.completed_at,
+        Task.verified_at,
+        Task.verified_by,
+        Task.is_blocking,
+    ).outerjoin(
+        Task.assigned_to.of_type(assignee)
+    ).outerjoin(
+        Task.reviewer.of_type(reviewer)
+    ).where(Task.project_id == project_id)
     
     if stage:
-        query = query.filter(Task.raci_stage == stage)
+        query = query.where(Task.raci_stage == stage)
     
     if status:
-        query = query.filter(Task.status == status)
-    
-    tasks = query.order_by(Task.created_at.desc()).all()
-    
-    logger.info(f"Found {len(tasks)} tasks for project {project_id}")
-    print(f"Found {len(tasks)} tasks for project {project_id}")
-    print(f"Task IDs: {[str(t.id) for t in tasks]}")
-    print(f"First task (if any): {tasks[0].__dict__ if tasks else 'None'}")
-    
-    result = []
-    for task in tasks:
-        # Handle missing columns gracefully
-        raci_stage = getattr(task, 'raci_stage', None)
-        raci_task_name = getattr(task, 'raci_task_name', None)
-        reviewer_id = getattr(task, 'reviewer_id', None)
-        estimated_time_hours = getattr(task, 'estimated_time_hours', None)
-        actual_time_hours = getattr(task, 'actual_time_hours', None)
-        assigned_user = None
-        reviewer_user = None
-        if task.assigned_to_user_id:
-            assigned_user = db.query(User).filter(User.id == task.assigned_to_user_id).first()
-        if reviewer_id:  # Use the variable from getattr, not task.reviewer_id directly
-            reviewer_user = db.query(User).filter(User.id == reviewer_id).first()
-        
-        try:
-            task_data = {
-                "id": str(task.id),  # Convert to string for compatibility
-                "project_id": task.project_id,
-                "task_type": task.task_type,
-                "title": task.title,
-                "description": task.description,
-                "raci_stage": raci_stage,
-                "raci_task_name": raci_task_name,
-                "assigned_to_user_id": task.assigned_to_user_id,
-                "assigned_to_name": assigned_user.name if assigned_user else None,
-                "reviewer_id": reviewer_id,
-                "reviewer_name": reviewer_user.name if reviewer_user else None,
-                "required_role": task.required_role,
-                "estimated_time_hours": estimated_time_hours,
-                "actual_time_hours": actual_time_hours,
-                "status": task.status,
-                "priority": task.priority,
-                "due_at": task.due_at,
-                "created_at": task.created_at,
-                "completed_at": task.completed_at,
-                "verified_at": task.verified_at,
-                "verified_by": task.verified_by,
-                "is_blocking": task.is_blocking
-            }
-            
-            try:
-                task_read = TaskRead(**task_data)
-                # Convert to dict for JSON serialization
-                task_dict = task_read.model_dump()
-                result.append(task_dict)
-                logger.debug(f"Task {task.id} serialized successfully")
-            except Exception as serialize_error:
-                logger.error(f"Error serializing task {task.id}: {serialize_error}")
-                print(f"ERROR serializing task {task.id}: {serialize_error}")
-                print(f"Task data: {task_data}")
-                traceback.print_exc()
-                # Try to return raw dict instead
-                result.append(task_data)
-        except Exception as e:
-            # Log error but continue processing other tasks
-            logger.error(f"Error processing task {task.id}: {str(e)}", exc_info=True)
-            print(f"ERROR processing task {task.id}: {str(e)}")
-            traceback.print_exc()
-            continue
+        query = query.where(Task.status == status)
     
-    logger.info(f"Returning {len(result)} tasks")
-    print(f"Returning {len(result)} tasks")
-    print(f"First task (if any): {result[0] if result else 'None'}")
-    return result
+    query = query.order_by(Task.created_at.desc()).execution_options(yield_per=_TASK_STREAM_BATCH_SIZE)
+    
+    async def stream_tasks():
+        # Server-side cursor, _TASK_STREAM_BATCH_SIZE rows at a time; each row is encoded as it
+        # arrives. Columns already have TaskRead's types and keys, so rows go straight to orjson
+        # (no TaskRead round-trip); id stays a string for compatibility
+        yield b"["
+        count = 0
+        try:
+            async for row in (await db.stream(query)).mappings():
+                yield (b"," if count else b"") + orjson.dumps({**row, "id": str(row["id"])})
+                count += 1
+        except Exception:
+            # Headers (200) are already sent: the client only sees a truncated body, so log it here
+            logger.exception("Task stream for project %s failed after %d tasks", project_id, count)
+            raise
+        yield b"]"
+        logger.info("Returned %d tasks for project %s", count, project_id)
+    
+    return StreamingResponse(stream_tasks(), media_type="application/json")
 
 
 @router.post("/{project_id}/tasks", response_model=dict, status_code=status.HTTP_201_CREATED)
 def create_project_task(
-    project_id: str,
+    project_id: UUID,
     payload: dict,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_active_user),
 ):
     """Create a new task for a project"""
-    from uuid import UUID
-    from app.models.entities import Task
-    from app.core.enums import TaskStatus
     
-    try:
-        project_uuid = UUID(project_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid project ID format")
-    
-    project = db.query(Project).filter(Project.id == project_uuid).first()
+    project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -995,7 +1130,6 @@ def create_project_task(
     assigned_to_user_id = None
     if payload.get("assigned_to_user_id"):
         try:
-            from app.models.entities import User
             user_uuid = UUID(payload["assigned_to_user_id"])
             user = db.query(User).filter(User.id == user_uuid).first()
             if user:
@@ -1015,7 +1149,6 @@ def create_project_task(
     reviewer_id = None
     if payload.get("reviewer_id"):
         try:
-            from app.models.entities import User
             reviewer_uuid = UUID(payload["reviewer_id"])
             reviewer = db.query(User).filter(User.id == reviewer_uuid).first()
             if reviewer:
@@ -1032,7 +1165,7 @@ def create_project_task(
             )
     
     task = Task(
-        project_id=project_uuid,
+        project_id=project_id,
         task_type=payload.get("task_type", "GENERAL"),
         title=payload.get("title"),
         description=payload.get("description"),
@@ -1061,24 +1194,15 @@ def create_project_task(
 
 @router.put("/{project_id}/tasks/{task_id}", response_model=dict)
 def update_project_task(
-    project_id: str,
-    task_id: str,
+    project_id: UUID,
+    task_id: UUID,
     payload: dict,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_active_user),
 ):
     """Update a task"""
-    from uuid import UUID
-    from app.models.entities import Task
-    from app.core.enums import TaskStatus
-    
-    try:
-        project_uuid = UUID(project_id)
-        task_uuid = UUID(task_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid ID format")
     
-    task = db.query(Task).filter(Task.id == task_uuid, Task.project_id == project_uuid).first()
+    task = db.query(Task).filter(Task.id == task_id, Task.project_id == project_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -1090,7 +1214,7 @@ def update_project_task(
         old_status = task.status
         task.status = payload["status"]
         if payload["status"] == TaskStatus.COMPLETED.value:
-            task.completed_at = datetime.utcnow()
+            task.completed_at = utcnow()
             
             # Auto-trigger next task in sequence: Creation → Review → Approval
             # Check if this task is part of a RACI sequence
@@ -1098,39 +1222,30 @@ def update_project_task(
                 base_task_name = task.raci_task_name
                 
                 # Determine current task type from title
+                next_title = None
                 if task.title.endswith(" Creation"):
                     # Creation completed → trigger Review
-                    review_title = f"{base_task_name} Review"
-                    review_task = db.query(Task).filter(
-                        Task.project_id == project_uuid,
-                        Task.raci_stage == task.raci_stage,
-                        Task.raci_task_name == base_task_name,
-                        Task.title == review_title,
-                        Task.status == TaskStatus.OPEN.value
-                    ).first()
-                    
-                    if review_task:
-                        review_task.status = TaskStatus.IN_PROGRESS.value
-                        logger.info(f"Auto-triggered Review task: {review_title}")
-                
+                    next_title = f"{base_task_name} Review"
                 elif task.title.endswith(" Review"):
                     # Review completed → trigger Approval
-                    approval_title = f"{base_task_name} Approval"
-                    approval_task = db.query(Task).filter(
-                        Task.project_id == project_uuid,
-                        Task.raci_stage == task.raci_stage,
-                        Task.raci_task_name == base_task_name,
-                        Task.title == approval_title,
-                        Task.status == TaskStatus.OPEN.value
-                    ).first()
-                    
-                    if approval_task:
-                        approval_task.status = TaskStatus.IN_PROGRESS.value
-                        logger.info(f"Auto-triggered Approval task: {approval_title}")
+                    next_title = f"{base_task_name} Approval"
+                
+                if next_title:
+                    # Single UPDATE (no SELECT + attribute set); served by ix_task_project_raci
+                    triggered = db.execute(
+                        update(Task).where(
+                            Task.project_id == project_id,
+                            Task.raci_stage == task.raci_stage,
+                            Task.raci_task_name == base_task_name,
+                            Task.title == next_title,
+                            Task.status == TaskStatus.OPEN.value
+                        ).values(status=TaskStatus.IN_PROGRESS.value)
+                    ).rowcount
+                    if triggered:
+                        logger.info(f"Auto-triggered task: {next_title}")
     if "assigned_to_user_id" in payload:
         if payload["assigned_to_user_id"]:
             try:
-                from app.models.entities import User
                 user_uuid = UUID(payload["assigned_to_user_id"])
                 user = db.query(User).filter(User.id == user_uuid).first()
                 if user:
@@ -1151,7 +1266,6 @@ def update_project_task(
     if "reviewer_id" in payload:
         if payload["reviewer_id"]:
             try:
-                from app.models.entities import User
                 reviewer_uuid = UUID(payload["reviewer_id"])
                 reviewer = db.query(User).filter(User.id == reviewer_uuid).first()
                 if reviewer:
@@ -1187,54 +1301,67 @@ def update_project_task(
 
 @router.delete("/{project_id}/tasks/{task_id}", response_model=dict)
 def delete_project_task(
-    project_id: str,
-    task_id: str,
+    project_id: UUID,
+    task_id: UUID,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_active_user),
 ):
     """Delete a task"""
-    from uuid import UUID
-    from app.models.entities import Task
-    
-    try:
-        project_uuid = UUID(project_id)
-        task_uuid = UUID(task_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid ID format")
     
-    task = db.query(Task).filter(Task.id == task_uuid, Task.project_id == project_uuid).first()
+    task = db.query(Task).filter(Task.id == task_id, Task.project_id == project_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
     db.delete(task)
     db.commit()
     
-    return {"id": str(task_uuid), "status": "deleted"}
+    return {"id": str(task_id), "status": "deleted"}
+
+
+# Duplicate RACI tasks, numbered oldest-first within each group, deleted in one statement per rule
+# (rn > 1 keeps the oldest task of every group)
+_DELETE_DUPLICATE_RACI_TASKS = text("""
+    DELETE FROM tasks
+    WHERE id IN (
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY raci_stage, raci_task_name, required_role ORDER BY created_at, id
+            ) AS rn
+            FROM tasks
+            WHERE project_id = :project_id
+              AND raci_stage IS NOT NULL AND raci_task_name IS NOT NULL AND required_role IS NOT NULL
+        ) numbered
+        WHERE rn > 1
+    )
+""")
+
+_DELETE_DUPLICATE_RACI_TASK_TITLES = text("""
+    DELETE FROM tasks
+    WHERE id IN (
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY title ORDER BY created_at, id) AS rn
+            FROM tasks
+            WHERE project_id = :project_id AND raci_stage IS NOT NULL AND raci_task_name IS NOT NULL
+        ) numbered
+        WHERE rn > 1
+    )
+""")
 
 
 @router.post("/{project_id}/tasks/fix-raci-tasks", response_model=dict)
 def fix_existing_raci_tasks(
-    project_id: str,
+    project_id: UUID,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_active_user),
 ):
     """Fix existing RACI-generated tasks to match new naming and type rules, and remove duplicates"""
-    from uuid import UUID
-    from app.models.entities import Task, Project
-    from app.core.enums import TaskStatus
-    from sqlalchemy import func
-    
-    try:
-        project_uuid = UUID(project_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid project ID format")
     
-    project = db.query(Project).filter(Project.id == project_uuid).first()
+    project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     # Get RACI matrix
-    raci_matrix = project.raci_matrix_json or _get_default_raci_matrix()
+    raci_matrix = project.raci_matrix_json or _DEFAULT_RACI_MATRIX  # read-only here, no copy needed
     if not raci_matrix or "stages" not in raci_matrix:
         raise HTTPException(
             status_code=400,
@@ -1246,62 +1373,10 @@ def fix_existing_raci_tasks(
     duplicate_count = 0
     
     # Method 1: Remove duplicates by stage/task/role combination
-    duplicates_by_raci = db.query(
-        Task.raci_stage,
-        Task.raci_task_name,
-        Task.required_role
-    ).filter(
-        Task.project_id == project_uuid,
-        Task.raci_stage.isnot(None),
-        Task.raci_task_name.isnot(None),
-        Task.required_role.isnot(None)
-    ).group_by(
-        Task.raci_stage,
-        Task.raci_task_name,
-        Task.required_role
-    ).having(
-        func.count(Task.id) > 1
-    ).all()
-    
-    for dup in duplicates_by_raci:
-        # Find all tasks with this combination
-        duplicate_tasks = db.query(Task).filter(
-            Task.project_id == project_uuid,
-            Task.raci_stage == dup.raci_stage,
-            Task.raci_task_name == dup.raci_task_name,
-            Task.required_role == dup.required_role
-        ).order_by(Task.created_at).all()
-        
-        # Keep the first (oldest) one, delete the rest
-        if len(duplicate_tasks) > 1:
-            for task_to_delete in duplicate_tasks[1:]:
-                db.delete(task_to_delete)
-                duplicate_count += 1
+    duplicate_count += db.execute(_DELETE_DUPLICATE_RACI_TASKS, {"project_id": project_id}).rowcount
     
     # Method 2: Remove duplicates by title (in case titles match but RACI fields differ)
-    duplicates_by_title = db.query(
-        Task.title
-    ).filter(
-        Task.project_id == project_uuid,
-        Task.raci_stage.isnot(None),
-        Task.raci_task_name.isnot(None)
-    ).group_by(
-        Task.title
-    ).having(
-        func.count(Task.id) > 1
-    ).all()
-    
-    for dup_title in duplicates_by_title:
-        duplicate_tasks = db.query(Task).filter(
-            Task.project_id == project_uuid,
-            Task.title == dup_title.title
-        ).order_by(Task.created_at).all()
-        
-        # Keep the first (oldest) one, delete the rest
-        if len(duplicate_tasks) > 1:
-            for task_to_delete in duplicate_tasks[1:]:
-                db.delete(task_to_delete)
-                duplicate_count += 1
+    duplicate_count += db.execute(_DELETE_DUPLICATE_RACI_TASK_TITLES, {"project_id": project_id}).rowcount
     
     if duplicate_count > 0:
         db.commit()
@@ -1309,7 +1384,7 @@ def fix_existing_raci_tasks(
     
     # Get all existing tasks for this project that have RACI data (after removing duplicates)
     existing_tasks = db.query(Task).filter(
-        Task.project_id == project_uuid,
+        Task.project_id == project_id,
         Task.raci_stage.isnot(None),
         Task.raci_task_name.isnot(None),
         Task.required_role.isnot(None)
@@ -1318,16 +1393,8 @@ def fix_existing_raci_tasks(
     updated_count = 0
     skipped_count = 0
     
-    # Build a mapping of stage/task/role to RACI value
-    raci_mapping = {}
-    for stage in raci_matrix.get("stages", []):
-        stage_name = stage.get("stage")
-        for raci_task in stage.get("tasks", []):
-            task_name = raci_task.get("task")
-            roles = raci_task.get("roles", {})
-            for role, raci_value in roles.items():
-                key = (stage_name, task_name, role)
-                raci_mapping[key] = raci_value
+    # Mapping of stage/task/role to RACI value (memoized per matrix content)
+    raci_mapping = _raci_mapping(raci_matrix)
     
     # Update each task
     for task in existing_tasks:
@@ -1350,8 +1417,7 @@ def fix_existing_raci_tasks(
         elif raci_value == "R":
             # Responsible → Creation task
             # Check if task_name matches "TG (TG X)" pattern and convert to "TG X Trial"
-            import re
-            tg_match = re.match(r'TG\s*\(TG\s*(\d+)\)', task_name, re.IGNORECASE)
+            tg_match = _TG_RE.match(task_name)
             if tg_match:
                 tg_number = tg_match.group(1)
                 new_title = f"{task_prefix}TG {tg_number} Trial" if task_prefix else f"TG {tg_number} Trial"
@@ -1384,7 +1450,7 @@ def fix_existing_raci_tasks(
     db.commit()
     
     return {
-        "project_id": str(project_uuid),
+        "project_id": str(project_id),
         "updated_count": updated_count,
         "skipped_count": skipped_count,
         "duplicate_count": duplicate_count,
@@ -1394,49 +1460,24 @@ def fix_existing_raci_tasks(
 
 @router.post("/{project_id}/tasks/generate-from-raci", response_model=dict)
 def generate_tasks_from_raci(
-    project_id: str,
+    project_id: UUID,
     payload: GenerateTasksFromRACIRequest,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_active_user),
 ):
     """Generate tasks automatically from RACI matrix"""
-    from uuid import UUID
-    from app.models.entities import Task, User
-    from app.core.enums import TaskStatus
-    import logging
-    import traceback
-    
-    logger = logging.getLogger(__name__)
-    
-    logger.info("=" * 80)
-    logger.info(f"GENERATE TASKS FROM RACI - ENTRY POINT")
-    logger.info(f"project_id={project_id}")
-    logger.info(f"payload={payload}")
-    logger.info(f"payload type={type(payload)}")
-    print("=" * 80)
-    print(f"GENERATE TASKS FROM RACI - ENTRY POINT")
-    print(f"project_id={project_id}")
-    print(f"payload={payload}")
-    print(f"payload type={type(payload)}")
+    
     
     try:
-        logger.info(f"Generate tasks request: project_id={project_id}, payload={payload}")
-        print(f"GENERATE TASKS REQUEST: project_id={project_id}, payload={payload}")
-        print(f"Payload type: {type(payload)}, task_type={payload.task_type}, task_prefix={payload.task_prefix}, priority={payload.priority}")
-        
-        try:
-            project_uuid = UUID(project_id)
-        except ValueError as e:
-            logger.error(f"Invalid project ID format: {project_id}, error: {str(e)}")
-            raise HTTPException(status_code=400, detail=f"Invalid project ID format: {project_id}")
+        logger.info("Generate tasks request: project_id=%s, payload=%s", project_id, payload)
         
-        project = db.query(Project).filter(Project.id == project_uuid).first()
+        project = db.query(Project).filter(Project.id == project_id).first()
         if not project:
             logger.error(f"Project not found: {project_id}")
             raise HTTPException(status_code=404, detail="Project not found")
         
         # Get RACI matrix - use default if not configured
-        raci_matrix = project.raci_matrix_json or _get_default_raci_matrix()
+        raci_matrix = project.raci_matrix_json or _DEFAULT_RACI_MATRIX  # read-only here, no copy needed
         if not raci_matrix or "stages" not in raci_matrix:
             logger.error(f"RACI matrix not configured for project: {project_id} and default is also invalid")
             raise HTTPException(
@@ -1446,12 +1487,11 @@ def generate_tasks_from_raci(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in generate_tasks_from_raci: {str(e)}")
-        traceback.print_exc()
+        logger.error(f"Unexpected error in generate_tasks_from_raci: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
     
     # Get team members mapping
-    team_members = _get_team_members_dict(project_uuid, db)
+    team_members = _get_team_members_dict(project_id, db)
     
     # Get role assignments from RACI
     role_assignments = raci_matrix.get("role_assignments", {})
@@ -1460,6 +1500,31 @@ def generate_tasks_from_raci(
     task_type = payload.task_type
     task_prefix = payload.task_prefix
     
+    # Every user a role can be assigned to, checked for existence in one IN query up front
+    # instead of one lookup per generated task
+    candidate_user_ids = {member["user"].id for member in team_members.values()}
+    for candidate in role_assignments.values():
+        if isinstance(candidate, UUID):
+            candidate_user_ids.add(candidate)
+        elif isinstance(candidate, str):
+            try:
+                candidate_user_ids.add(UUID(candidate))
+            except ValueError:
+                pass  # Reported when a task would be assigned to it
+    existing_user_ids = set(db.scalars(
+        select(User.id).where(User.id.in_(candidate_user_ids))
+    ).all()) if candidate_user_ids else set()
+    
+    # Existing tasks indexed once by RACI triple and by title, instead of two queries per combination
+    existing_by_raci = set()
+    existing_by_title = set()
+    for existing in db.execute(
+        select(Task.raci_stage, Task.raci_task_name, Task.required_role, Task.title).where(Task.project_id == project_id)
+    ):
+        existing_by_raci.add((existing.raci_stage, existing.raci_task_name, existing.required_role))
+        existing_by_title.add(existing.title)
+    
+    new_tasks = []
     created_tasks = []
     skipped_tasks = []
     
@@ -1530,8 +1595,7 @@ def generate_tasks_from_raci(
                 elif raci_value == "R":
                     # Responsible → Creation task
                     # Check if task_name matches "TG (TG X)" pattern and convert to "TG X Trial"
-                    import re
-                    tg_match = re.match(r'TG\s*\(TG\s*(\d+)\)', task_name, re.IGNORECASE)
+                    tg_match = _TG_RE.match(task_name)
                     if tg_match:
                         tg_number = tg_match.group(1)
                         task_title = f"{task_prefix}TG {tg_number} Trial" if task_prefix else f"TG {tg_number} Trial"
@@ -1551,19 +1615,7 @@ def generate_tasks_from_raci(
                     task_description = f"Auto-generated task for {stage_name} / {task_name} - Role: {role} ({raci_value})"
                 
                 # Check if task already exists - by RACI fields AND by title (to catch duplicates)
-                existing_by_raci = db.query(Task).filter(
-                    Task.project_id == project_uuid,
-                    Task.raci_stage == stage_name,
-                    Task.raci_task_name == task_name,
-                    Task.required_role == role
-                ).first()
-                
-                existing_by_title = db.query(Task).filter(
-                    Task.project_id == project_uuid,
-                    Task.title == task_title
-                ).first()
-                
-                if existing_by_raci or existing_by_title:
+                if (stage_name, task_name, role) in existing_by_raci or task_title in existing_by_title:
                     skipped_tasks.append({
                         "stage": stage_name,
                         "task": task_name,
@@ -1577,23 +1629,20 @@ def generate_tasks_from_raci(
                 if user_id:
                     try:
                         user_uuid = UUID(user_id) if isinstance(user_id, str) else user_id
-                        # Verify user exists in database
-                        user_exists = db.query(User).filter(User.id == user_uuid).first()
-                        if user_exists:
+                        # Verify user exists in database (pre-fetched above)
+                        if user_uuid in existing_user_ids:
                             assigned_user_id = user_uuid
                         else:
                             logger.warning(f"User {user_uuid} not found, creating task without assignment")
-                            print(f"WARNING: User {user_uuid} not found, creating task without assignment")
                     except (ValueError, TypeError) as e:
                         # Invalid UUID, skip assignment
                         logger.warning(f"Invalid user_id format: {user_id}, error: {e}")
-                        print(f"WARNING: Invalid user_id format: {user_id}, error: {e}")
                         assigned_user_id = None
                 
                 # Create task - simplified without savepoints for better performance
                 try:
                     task = Task(
-                        project_id=project_uuid,
+                        project_id=project_id,
                         task_type=task_type_for_role,  # Use role-specific task type
                         title=task_title,  # Use role-specific title (e.g., "SDD Approval")
                         description=task_description,  # Use role-specific description
@@ -1606,9 +1655,12 @@ def generate_tasks_from_raci(
                         is_blocking=raci_value == "A"  # Accountable tasks are blocking
                     )
                     
-                    db.add(task)
-                    # Don't flush here - batch all adds and flush/commit at the end
-                    logger.debug(f"Task added to session: {task_title}")
+                    # Don't add/flush here - all new tasks are inserted together at the end
+                    new_tasks.append(task)
+                    logger.debug("Task staged: %s", task_title)
+                    # Later combinations in this call must see it as existing too
+                    existing_by_raci.add((stage_name, task_name, role))
+                    existing_by_title.add(task_title)
                     
                     created_tasks.append({
                         "title": task_title,
@@ -1617,9 +1669,7 @@ def generate_tasks_from_raci(
                         "role": role
                     })
                 except Exception as task_error:
-                    logger.error(f"Error creating task: {task_error}")
-                    print(f"ERROR creating task: {task_error}")
-                    traceback.print_exc()
+                    logger.error(f"Error creating task: {task_error}", exc_info=True)
                     skipped_tasks.append({
                         "stage": stage_name,
                         "task": task_name,
@@ -1628,59 +1678,44 @@ def generate_tasks_from_raci(
                     })
                     continue
     
-    logger.info(f"Flushing and committing {len(created_tasks)} tasks to database")
-    print(f"Flushing and committing {len(created_tasks)} tasks to database")
+    logger.info("Committing %d tasks to database", len(new_tasks))
     try:
-        db.flush()  # Flush to get IDs (if needed later)
+        # One add_all + commit: the flush sends the rows as a single batched multi-row INSERT
+        db.add_all(new_tasks)
         db.commit()  # Commit all tasks at once
         logger.info("Tasks committed successfully")
-        print("Tasks committed successfully")
         
         # Skip verification to speed up response - tasks are already committed
         # Verification can be done in a separate query if needed
     except Exception as commit_error:
-        logger.error(f"Error committing tasks: {commit_error}")
-        print(f"ERROR committing tasks: {commit_error}")
-        traceback.print_exc()
+        logger.error(f"Error committing tasks: {commit_error}", exc_info=True)
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to commit tasks: {str(commit_error)}")
     
     result = {
-        "project_id": str(project_uuid),
+        "project_id": str(project_id),
         "created_count": len(created_tasks),
         "skipped_count": len(skipped_tasks),
         "created_tasks": created_tasks,
         "skipped_tasks": skipped_tasks
     }
     
-    logger.info(f"Generate tasks result: created={len(created_tasks)}, skipped={len(skipped_tasks)}")
-    print(f"GENERATE TASKS RESULT: created={len(created_tasks)}, skipped={len(skipped_tasks)}")
-    print(f"Created tasks: {created_tasks}")
-    print(f"Skipped tasks: {skipped_tasks}")
+    logger.info("Generate tasks result: created=%d, skipped=%d", len(created_tasks), len(skipped_tasks))
     
     return result
 
 
 @router.post("/{project_id}/tasks/{task_id}/review", response_model=dict)
 def review_task(
-    project_id: str,
-    task_id: str,
+    project_id: UUID,
+    task_id: UUID,
     payload: dict,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_active_user),
 ):
     """Review a task (approve, reject, request changes)"""
-    from uuid import UUID
-    from app.models.entities import Task
-    from app.core.enums import TaskStatus
-    
-    try:
-        project_uuid = UUID(project_id)
-        task_uuid = UUID(task_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid ID format")
     
-    task = db.query(Task).filter(Task.id == task_uuid, Task.project_id == project_uuid).first()
+    task = db.query(Task).filter(Task.id == task_id, Task.project_id == project_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -1688,7 +1723,7 @@ def review_task(
     
     if action == "APPROVE":
         task.status = TaskStatus.VERIFIED.value
-        task.verified_at = datetime.utcnow()
+        task.verified_at = utcnow()
         task.verified_by = current_user.id
         # Move to reviewer if exists
         if task.reviewer_id:
@@ -543,45 +543,32 @@ def upload_template_file(
     uploaded_key, file_hash = upload_file(content, object_key, file.content_type or "application/octet-stream")
     
     # HIPAA/GxP/GIS Compliance: Audit log for file upload
-    # Use separate session for audit log to avoid transaction conflicts
+    # Must be durable before responding; concurrent requests share one audit commit
+    from app.services.audit import log_action_durable, AuditAction
+    
+    client_ip = request.client.host if request.client else None
+    user_agent = request.headers.get("user-agent")
+    
     try:
-        from app.services.audit import log_action, AuditAction
-        from app.db import SessionLocal
-        
-        client_ip = request.client.host if request.client else None
-        user_agent = request.headers.get("user-agent")
-        
-        # Use separate session for audit logging to avoid transaction conflicts
-        audit_db = SessionLocal()
-        try:
-            log_action(
-                audit_db,
-                actor_user_id=current_user.id,
-                action=AuditAction.TEMPLATE_CREATE,  # Using TEMPLATE_CREATE for file upload
-                entity_type="TemplateFile",
-                entity_id=str(uploaded_key),  # Use object_key as entity_id for file uploads
-                after_json={
-                    "action": "file_upload",
-                    "object_key": uploaded_key,
-                    "filename": file.filename,
-                    "file_size": len(content),
-                    "file_hash": file_hash[:20] + "...",  # Partial hash for audit
-                },
-                ip=client_ip,
-                user_agent=user_agent,
-            )
-            audit_db.commit()
-        except Exception as audit_error:
-            audit_db.rollback()
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Audit logging failed: {str(audit_error)}. File uploaded: {uploaded_key} by user {current_user.id}")
-        finally:
-            audit_db.close()
+        log_action_durable(
+            actor_user_id=current_user.id,
+            action=AuditAction.TEMPLATE_CREATE,  # Using TEMPLATE_CREATE for file upload
+            entity_type="TemplateFile",
+            entity_id=str(uploaded_key),  # Use object_key as entity_id for file uploads
+            after_json={
+                "action": "file_upload",
+                "object_key": uploaded_key,
+                "filename": file.filename,
+                "file_size": len(content),
+                "file_hash": file_hash[:20] + "...",  # Partial hash for audit
+            },
+            ip=client_ip,
+            user_agent=user_agent,
+        )
     except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.warning(f"Audit logging setup failed: {str(e)}. File uploaded: {uploaded_key} by user {current_user.id}")
+        # No audit record, no success response
+        logger.error(f"Audit log write failed: {str(e)}. File uploaded: {uploaded_key} by user {current_user.id}")
+        raise HTTPException(status_code=500, detail="File upload could not be recorded in the audit log")
     
     return {
         "object_key": uploaded_key,
@@ -897,7 +884,7 @@ def update_template(
 ):
     """Update a template."""
     from uuid import UUID
-    from app.services.audit import log_action, AuditAction, model_to_dict
+    from app.services.audit import AuditAction, model_to_dict
     
     try:
         template_uuid = UUID(template_id)
@@ -1044,9 +1031,9 @@ def update_template(
     db.flush()
     
     # HIPAA/GxP/GIS Compliance: Audit log for template update
-    # Use separate session for audit logging to avoid transaction conflicts
+    # Queued for the background audit writer - no extra commit on the request path
     try:
-        from app.db import SessionLocal
+        from app.services.audit import log_action_async
         
         client_ip = request.client.host if request.client else None
         user_agent = request.headers.get("user-agent")
@@ -1058,29 +1045,17 @@ def update_template(
         if 'file_hash' in after_dict and after_dict['file_hash']:
             after_dict['file_hash'] = after_dict['file_hash'][:20] + "..."
         
-        # Use separate session for audit logging
-        audit_db = SessionLocal()
-        try:
-            log_action(
-                audit_db,
-                actor_user_id=current_user.id,
-                action=AuditAction.TEMPLATE_UPDATE,
-                entity_type="Template",
-                entity_id=template.id,
-                org_id=template.org_id,
-                before_json=before_dict,
-                after_json=after_dict,
-                ip=client_ip,
-                user_agent=user_agent,
-            )
-            audit_db.commit()
-        except Exception as audit_error:
-            audit_db.rollback()
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Audit logging failed: {str(audit_error)}. Template updated: {template.id} by user {current_user.id}")
-        finally:
-            audit_db.close()
+        log_action_async(
+            actor_user_id=current_user.id,
+            action=AuditAction.TEMPLATE_UPDATE,
+            entity_type="Template",
+            entity_id=template.id,
+            org_id=template.org_id,
+            before_json=before_dict,
+            after_json=after_dict,
+            ip=client_ip,
+            user_agent=user_agent,
+        )
     except Exception as e:
         import logging
         logger = logging.getLogger(__name__)
@@ -1174,7 +1149,7 @@ def get_template_file(
     from fastapi.responses import StreamingResponse
     from io import BytesIO
     import os
-    from app.services.audit import log_action, AuditAction
+    from app.services.audit import log_action_durable, AuditAction
     
     try:
         template_uuid = UUID(template_id)
@@ -1213,40 +1188,27 @@ def get_template_file(
         logger.warning(f"Access check failed: {str(access_error)}. Allowing access to template {template.id} for user {current_user.id}")
     
     # HIPAA/GxP/GIS Compliance: Audit log for template file access
-    # Use separate session for audit logging to avoid transaction conflicts
+    # Must be durable before responding; concurrent requests share one audit commit
+    client_ip = request.client.host if request.client else None
+    user_agent = request.headers.get("user-agent")
+    
     try:
-        from app.services.audit import log_action, AuditAction
-        from app.db import SessionLocal
-        
-        client_ip = request.client.host if request.client else None
-        user_agent = request.headers.get("user-agent")
-        
-        # Use separate session for audit logging to avoid transaction conflicts
-        audit_db = SessionLocal()
-        try:
-            log_action(
-                audit_db,
-                actor_user_id=current_user.id,
-                action=AuditAction.TEMPLATE_VIEW,
-                entity_type="Template",
-                entity_id=template.id,
-                org_id=template.org_id,
-                after_json={"action": "file_download", "object_key": template.object_key},
-                ip=client_ip,
-                user_agent=user_agent,
-            )
-            audit_db.commit()
-        except Exception as audit_error:
-            audit_db.rollback()
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Audit logging failed: {str(audit_error)}. Template file accessed: {template.id} by user {current_user.id}")
-        finally:
-            audit_db.close()
+        log_action_durable(
+            actor_user_id=current_user.id,
+            action=AuditAction.TEMPLATE_VIEW,
+            entity_type="Template",
+            entity_id=template.id,
+            org_id=template.org_id,
+            after_json={"action": "file_download", "object_key": template.object_key},
+            ip=client_ip,
+            user_agent=user_agent,
+        )
     except Exception as e:
+        # No audit record, no file
         import logging
         logger = logging.getLogger(__name__)
-        logger.warning(f"Audit logging setup failed: {str(e)}. Template file accessed: {template.id} by user {current_user.id}")
+        logger.error(f"Audit log write failed: {str(e)}. Template file access denied: {template.id} for user {current_user.id}")
+        raise HTTPException(status_code=500, detail="Template file access could not be recorded in the audit log")
     
     # Try to use storage service if available
     import logging
@@ -1,6 +1,6 @@
 from .auth import Token, LoginRequest, UserRead
 from .projects import ProjectCreate, ProjectRead, ProjectUpdate, ProjectMemberInvite, ProjectMemberRead
 from .templates import TemplateCreate, TemplateRead, TemplateUpdate
-from .documents import DocumentCreate, DocumentRead, DocumentVersionCreate, DocumentVersionRead
+from .documents import DocumentCreate, DocumentRead, DocumentVersionCreate, DocumentVersionListItem, DocumentVersionRead
 from .document_types import DocumentTypeCreate, DocumentTypeRead, DocumentTypeUpdate
 
@@ -33,14 +33,26 @@ class DocumentVersionCreate(BaseModel):
     created_by: Optional[UUID] = None
 
 
-class DocumentVersionRead(BaseModel):
+class TemplateBrief(BaseModel):
+    """Template info embedded in document version responses."""
+    id: UUID
+    doc_type: str
+    name: str
+    object_key: str
+    file_hash: str
+
+    class Config:
+        from_attributes = True
+
+
+class DocumentVersionListItem(BaseModel):
+    """Version metadata for list responses (content_json is fetched per version)."""
     id: UUID
     document_id: UUID
     version_string: str
     state: str
     template_id: Optional[UUID] = None
-    template: Optional[dict] = None  # Template info (doc_type, object_key, etc.)
-    content_json: Optional[dict] = None
+    template: Optional[TemplateBrief] = None  # Template info (doc_type, object_key, etc.)
     pkb_snapshot_id: Optional[UUID] = None
     file_object_key: Optional[str] = None
     file_hash: Optional[str] = None
@@ -52,3 +64,6 @@ class DocumentVersionRead(BaseModel):
     class Config:
         from_attributes = True
 
+
+class DocumentVersionRead(DocumentVersionListItem):
+    content_json: Optional[dict] = None
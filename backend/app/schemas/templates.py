@@ -1,8 +1,11 @@
 from typing import Optional
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 
+# file_hash is stored as raw SHA-256 bytes, so only hex digests are accepted
+SHA256_HEX_PATTERN = r"^[0-9a-fA-F]{64}$"
+
 
 class TemplateCreate(BaseModel):
     org_id: Optional[UUID] = None
@@ -10,7 +13,7 @@ class TemplateCreate(BaseModel):
     name: str
     version: Optional[str] = "v1"
     object_key: str
-    file_hash: str
+    file_hash: str = Field(..., pattern=SHA256_HEX_PATTERN)
     status: Optional[str] = "DRAFT"
     mapping_manifest_json: dict
     created_by: Optional[UUID] = None
@@ -21,7 +24,7 @@ class TemplateUpdate(BaseModel):
     name: Optional[str] = None
     version: Optional[str] = None
     object_key: Optional[str] = None
-    file_hash: Optional[str] = None
+    file_hash: Optional[str] = Field(None, pattern=SHA256_HEX_PATTERN)
     mapping_manifest_json: Optional[dict] = None
     status: Optional[str] = None
 
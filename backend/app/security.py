@@ -1,17 +1,35 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import jwt
+from jose import jwk, jwt
 import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHash
 
 from app.config import get_settings
 
 settings = get_settings()
 
+# New hashes use argon2id; bcrypt hashes ($2b$...) are still verified and upgraded on login
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
+
+# Verified against when there's no real hash to check, so response time
+# doesn't reveal whether the account exists / is active
+DUMMY_PASSWORD_HASH = _password_hasher.hash("dummy-password-for-constant-time-checks")
+
+# JWT key constructed once; passing a string secret makes jose rebuild the key on every encode/decode
+JWT_KEY = jwk.construct(settings.jwt_secret, settings.jwt_algorithm)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
+    if hashed_password.startswith("$argon2"):
+        try:
+            return _password_hasher.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHash):
+            return False
     try:
-        # Bcrypt has a 72 byte limit, truncate if necessary
+        # Legacy bcrypt hashes were created from the password truncated to 72 bytes,
+        # so the same truncation has to be applied to verify them
         password_bytes = plain_password.encode('utf-8')
         if len(password_bytes) > 72:
             plain_password = password_bytes[:72].decode('utf-8', errors='ignore')
@@ -23,19 +41,17 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check if hash uses a legacy scheme (bcrypt) or outdated argon2 parameters."""
+    if not hashed_password.startswith("$argon2"):
+        return True
+    return _password_hasher.check_needs_rehash(hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """Hash a password."""
-    # Bcrypt has a 72 byte limit, truncate if necessary BEFORE hashing
-    if not password:
-        password = ""
-    password_bytes = password.encode('utf-8')
-    if len(password_bytes) > 72:
-        # Truncate to 72 bytes
-        password = password_bytes[:72].decode('utf-8', errors='ignore')
-    # Use bcrypt directly
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    # argon2 has no input length limit, so the full password is hashed as-is
+    return _password_hasher.hash(password or "")
 
 
 def create_access_token(data: str, expires_delta: Optional[timedelta] = None) -> str:
@@ -46,6 +62,6 @@ def create_access_token(data: str, expires_delta: Optional[timedelta] = None) ->
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.jwt_expire_minutes)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    encoded_jwt = jwt.encode(to_encode, JWT_KEY, algorithm=settings.jwt_algorithm)
     return encoded_jwt
 
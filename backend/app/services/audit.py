@@ -2,14 +2,28 @@
 Audit logging service for HIPAA/GxP/GIS compliance.
 Logs all actions on documents, projects, and other entities.
 """
-from typing import Optional, Dict, Any
-from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import insert, text
 from sqlalchemy.orm import Session
-from uuid import UUID
+from uuid import UUID, uuid4
 import logging
+import queue
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Background audit writer (log_action_async): rows are INSERTed in batches
+# of up to AUDIT_BATCH_SIZE, or whatever is pending every AUDIT_FLUSH_INTERVAL seconds
+AUDIT_BATCH_SIZE = 100
+AUDIT_FLUSH_INTERVAL = 0.5
+
+_audit_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+_audit_writer: Optional[threading.Thread] = None
+_audit_writer_lock = threading.Lock()
+_audit_stop = threading.Event()
+
 
 class AuditAction:
     """Audit action types for compliance tracking."""
@@ -41,6 +55,23 @@ class AuditAction:
     LOGOUT = "LOGOUT"
 
 
+def _audit_entity_id(entity_id: Any, after_json: Optional[Dict[str, Any]]):
+    """Convert entity_id to the UUID stored in audit_log; returns (entity_uuid, after_json)."""
+    if isinstance(entity_id, UUID):
+        return entity_id, after_json
+    if isinstance(entity_id, str):
+        try:
+            return UUID(entity_id), after_json
+        except ValueError:
+            # If it's not a valid UUID, use a default UUID
+            return UUID('00000000-0000-0000-0000-000000000000'), after_json
+    # For non-UUID entity_ids (like integers), convert to string and store in JSON
+    if after_json is None:
+        after_json = {}
+    after_json["entity_id"] = str(entity_id)
+    return UUID('00000000-0000-0000-0000-000000000000'), after_json
+
+
 def log_action(
     db: Session,
     actor_user_id: UUID,
@@ -73,21 +104,7 @@ def log_action(
     try:
         from app.models import AuditLog
         
-        # Convert entity_id to UUID if it's a string
-        if isinstance(entity_id, str):
-            try:
-                entity_id_uuid = UUID(entity_id)
-            except ValueError:
-                # If it's not a valid UUID, use a default UUID
-                entity_id_uuid = UUID('00000000-0000-0000-0000-000000000000')
-        elif isinstance(entity_id, UUID):
-            entity_id_uuid = entity_id
-        else:
-            # For non-UUID entity_ids (like integers), convert to string and store in JSON
-            entity_id_uuid = UUID('00000000-0000-0000-0000-000000000000')
-            if after_json is None:
-                after_json = {}
-            after_json["entity_id"] = str(entity_id)
+        entity_id_uuid, after_json = _audit_entity_id(entity_id, after_json)
         
         # HIPAA/GxP/GIS Compliance: All actions must be logged
         audit_log = AuditLog(
@@ -139,6 +156,219 @@ def log_action(
             pass
 
 
+def log_action_async(
+    actor_user_id: UUID,
+    action: str,
+    entity_type: str,
+    entity_id: Any,
+    org_id: Optional[UUID] = None,
+    project_id: Optional[UUID] = None,
+    before_json: Optional[Dict[str, Any]] = None,
+    after_json: Optional[Dict[str, Any]] = None,
+    ip: Optional[str] = None,
+    user_agent: Optional[str] = None,
+) -> None:
+    """
+    Queue an audit entry for the background writer and return immediately.
+
+    Use for audit entries that are written outside the caller's transaction
+    anyway (previously a separate session + commit per entry). Entries that
+    must commit atomically with the audited change should use log_action().
+    """
+    _audit_queue.put_nowait(_audit_row(
+        actor_user_id, action, entity_type, entity_id, org_id, project_id,
+        before_json, after_json, ip, user_agent,
+    ))
+    _ensure_audit_writer()
+
+
+def log_action_durable(
+    actor_user_id: UUID,
+    action: str,
+    entity_type: str,
+    entity_id: Any,
+    org_id: Optional[UUID] = None,
+    project_id: Optional[UUID] = None,
+    before_json: Optional[Dict[str, Any]] = None,
+    after_json: Optional[Dict[str, Any]] = None,
+    ip: Optional[str] = None,
+    user_agent: Optional[str] = None,
+) -> None:
+    """
+    Write an audit entry outside the caller's transaction and return once it is committed.
+
+    Concurrent callers are combined: whichever thread gets there first commits
+    every pending entry in one INSERT/commit, the others wait until their entry
+    is covered. Use for events that must not be lost on a crash (unlike
+    log_action_async) without paying one commit per request. If the batch
+    commit fails, every caller in it gets the error raised instead of returning.
+    """
+    _audit_batcher.append_and_wait(_audit_row(
+        actor_user_id, action, entity_type, entity_id, org_id, project_id,
+        before_json, after_json, ip, user_agent,
+    ))
+
+
+def _audit_row(
+    actor_user_id, action, entity_type, entity_id, org_id, project_id,
+    before_json, after_json, ip, user_agent,
+) -> Dict[str, Any]:
+    entity_id_uuid, after_json = _audit_entity_id(entity_id, after_json)
+    return {
+        "id": uuid4(),
+        "org_id": org_id,
+        "project_id": project_id,
+        "actor_user_id": actor_user_id,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id_uuid,
+        "before_json": before_json,
+        "after_json": after_json,
+        # Timestamp of the action, not of the batch INSERT
+        "created_at": datetime.utcnow(),
+        "ip": ip,
+        "user_agent": user_agent,
+    }
+
+
+class _AuditBatcher:
+    """
+    Flat-combining audit appender: entries get a sequence number, and the thread
+    that finds no flush in progress writes everything pending in one commit.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[int, Dict[str, Any]]] = []
+        self._next_seq = 0
+        self._durable_seq = 0
+        self._failed: Dict[int, Exception] = {}
+        self._flushing = False
+
+    def append_and_wait(self, row: Dict[str, Any]) -> None:
+        with self._cond:
+            self._next_seq += 1
+            seq = self._next_seq
+            self._pending.append((seq, row))
+            while self._durable_seq < seq and seq not in self._failed:
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+                # Become the combiner for everything queued so far
+                self._flushing = True
+                batch, self._pending = self._pending, []
+                upto = self._next_seq
+                self._cond.release()
+                error: Optional[Exception] = None
+                committed = False
+                try:
+                    _write_audit_batch([batch_row for _, batch_row in batch])
+                    committed = True
+                except Exception as e:
+                    error = e
+                finally:
+                    self._cond.acquire()
+                    self._flushing = False
+                    if committed:
+                        self._durable_seq = upto
+                    else:
+                        # Nothing in this batch was committed: every waiter in it re-raises
+                        error = error or RuntimeError("Audit batch write was interrupted")
+                        for batch_seq, _ in batch:
+                            self._failed[batch_seq] = error
+                    self._cond.notify_all()
+            error = self._failed.pop(seq, None)
+            if error is not None:
+                raise error
+
+
+_audit_batcher = _AuditBatcher()
+
+
+def _ensure_audit_writer() -> None:
+    global _audit_writer
+    if _audit_writer is not None and _audit_writer.is_alive():
+        return
+    with _audit_writer_lock:
+        if _audit_writer is None or not _audit_writer.is_alive():
+            _audit_stop.clear()
+            _audit_writer = threading.Thread(target=_audit_writer_loop, name="audit-writer", daemon=True)
+            _audit_writer.start()
+
+
+def _drain_audit_queue(timeout: float) -> List[Dict[str, Any]]:
+    """Wait up to timeout for the first entry, then take what's pending (up to a batch)."""
+    try:
+        batch = [_audit_queue.get(timeout=timeout)]
+    except queue.Empty:
+        return []
+    deadline = time.monotonic() + AUDIT_FLUSH_INTERVAL
+    while len(batch) < AUDIT_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_audit_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _write_audit_batch(rows: List[Dict[str, Any]]) -> None:
+    """Insert rows in one commit; logs each lost entry and re-raises on failure."""
+    from app.db import SessionLocal
+    from app.models import AuditLog
+
+    db = SessionLocal()
+    try:
+        # executemany -> multi-row INSERT ... VALUES (...), (...), one commit per batch
+        db.execute(insert(AuditLog), rows)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to write {len(rows)} audit log entries: {e}")
+        for row in rows:
+            logger.error(
+                f"Lost audit entry: {row['action']} on {row['entity_type']} {row['entity_id']} "
+                f"by user {row['actor_user_id']} at {row['created_at'].isoformat()}"
+            )
+        raise
+    finally:
+        db.close()
+
+
+def _audit_writer_loop() -> None:
+    while not _audit_stop.is_set():
+        batch = _drain_audit_queue(timeout=AUDIT_FLUSH_INTERVAL)
+        if batch:
+            try:
+                _write_audit_batch(batch)
+            except Exception:
+                # Already logged entry by entry; keep the writer alive
+                pass
+
+
+def flush_audit_log() -> None:
+    """Stop the background writer and write everything still queued (called on shutdown)."""
+    global _audit_writer
+    _audit_stop.set()
+    if _audit_writer is not None:
+        _audit_writer.join(timeout=5)
+        _audit_writer = None
+    pending = []
+    while True:
+        try:
+            pending.append(_audit_queue.get_nowait())
+        except queue.Empty:
+            break
+    for i in range(0, len(pending), AUDIT_BATCH_SIZE):
+        try:
+            _write_audit_batch(pending[i:i + AUDIT_BATCH_SIZE])
+        except Exception:
+            # Already logged entry by entry; keep flushing the remaining batches
+            pass
+
+
 def model_to_dict(model) -> Dict[str, Any]:
     """
     Convert SQLAlchemy model to dictionary for audit logging.
@@ -154,3 +384,117 @@ def model_to_dict(model) -> Dict[str, Any]:
             result[column.name] = value
     return result
 
+
+# Columns copied when rows are moved out of the DEFAULT partition
+# (same list as alembic 013_partition_audit_log)
+AUDIT_LOG_COLUMNS = (
+    "id, org_id, project_id, actor_user_id, action, entity_type, entity_id, "
+    "before_json, after_json, created_at, ip, user_agent"
+)
+
+# Partition maintenance: re-run daily so long-lived workers never cross a month
+# boundary without that month's partition existing
+AUDIT_PARTITION_MONTHS_AHEAD = 3
+AUDIT_PARTITION_CHECK_INTERVAL = 24 * 60 * 60
+
+_partition_maintainer: Optional[threading.Thread] = None
+_partition_stop = threading.Event()
+
+
+def ensure_audit_log_partitions(db: Session, months_ahead: int = AUDIT_PARTITION_MONTHS_AHEAD) -> None:
+    """
+    Create monthly audit_log partitions for the current month and the next
+    `months_ahead` months, plus the DEFAULT partition as a catch-all.
+    Rows that already landed in the DEFAULT partition for a missing month are
+    moved into the new partition. Safe to call repeatedly (startup + daily).
+    """
+    try:
+        db.execute(text("CREATE TABLE IF NOT EXISTS audit_log_default PARTITION OF audit_log DEFAULT"))
+        db.commit()
+    except Exception as e:
+        # Table not partitioned yet (migration not run)
+        logger.warning(f"Could not create audit_log default partition: {e}")
+        db.rollback()
+        return
+
+    month_start = datetime.utcnow().date().replace(day=1)
+    for _ in range(months_ahead + 1):
+        next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        try:
+            _create_audit_log_partition(db, month_start, next_month)
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Could not create audit_log partition for {month_start:%Y-%m}: {e}")
+            db.rollback()
+        month_start = next_month
+
+
+def _create_audit_log_partition(db: Session, start, end) -> None:
+    name = f"audit_log_{start:%Y_%m}"
+    if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return
+    bounds = {"start": start, "end": end}
+    create = (
+        f"CREATE TABLE {name} PARTITION OF audit_log "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+    stranded = db.execute(
+        text("SELECT 1 FROM audit_log_default WHERE created_at >= :start AND created_at < :end LIMIT 1"),
+        bounds,
+    ).first()
+    if stranded is None:
+        db.execute(text(create))
+        return
+    # The DEFAULT partition already holds rows for this month, so the new
+    # partition can't be attached while they are there: detach the default,
+    # create the month, move its rows across, and re-attach - one transaction.
+    logger.warning(f"Moving stranded audit_log rows from the default partition into {name}")
+    db.execute(text("ALTER TABLE audit_log DETACH PARTITION audit_log_default"))
+    db.execute(text(create))
+    db.execute(
+        text(
+            f"INSERT INTO {name} ({AUDIT_LOG_COLUMNS}) SELECT {AUDIT_LOG_COLUMNS} FROM audit_log_default "
+            f"WHERE created_at >= :start AND created_at < :end"
+        ),
+        bounds,
+    )
+    db.execute(
+        text("DELETE FROM audit_log_default WHERE created_at >= :start AND created_at < :end"),
+        bounds,
+    )
+    db.execute(text("ALTER TABLE audit_log ATTACH PARTITION audit_log_default DEFAULT"))
+
+
+def _partition_maintenance_loop() -> None:
+    from app.db import SessionLocal
+
+    while True:
+        db = SessionLocal()
+        try:
+            ensure_audit_log_partitions(db)
+        except Exception as e:
+            logger.error(f"Audit log partition maintenance failed: {e}")
+        finally:
+            db.close()
+        if _partition_stop.wait(AUDIT_PARTITION_CHECK_INTERVAL):
+            return
+
+
+def start_audit_partition_maintenance() -> None:
+    """Create audit_log partitions now and re-check them daily in a background thread."""
+    global _partition_maintainer
+    if _partition_maintainer is not None and _partition_maintainer.is_alive():
+        return
+    _partition_stop.clear()
+    _partition_maintainer = threading.Thread(
+        target=_partition_maintenance_loop, name="audit-partitions", daemon=True
+    )
+    _partition_maintainer.start()
+
+
+def stop_audit_partition_maintenance() -> None:
+    global _partition_maintainer
+    _partition_stop.set()
+    if _partition_maintainer is not None:
+        _partition_maintainer.join(timeout=5)
+        _partition_maintainer = None
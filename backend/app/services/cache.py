@@ -0,0 +1,184 @@
+"""
+Simple key/value cache for hot read paths (e.g. RBAC membership lookups).
+Uses Redis when REDIS_URL is configured, otherwise falls back to an
+in-process TTL dictionary so local development works without Redis.
+
+The fallback is for single-process development only: each worker has its
+own dictionary, so cache_delete in one worker leaves the entry in the
+others until its TTL runs out. Callers caching authorization data check
+cache_is_shared() and skip the cache when it is False.
+
+cache_get/cache_set/cache_delete block on Redis and are for sync code;
+async routes use the *_async variants (redis.asyncio) so a slow Redis
+never stalls the event loop.
+"""
+import threading
+import time
+from typing import Optional
+import logging
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_redis_client = None
+_redis_checked = False
+_async_redis_client = None
+_async_redis_checked = False
+
+# In-process fallback: key -> (expires_at_monotonic, value)
+_local_cache: dict[str, tuple[float, str]] = {}
+_local_lock = threading.Lock()
+
+
+def _get_redis():
+    """Get shared Redis client (connection pooled), or None if not configured."""
+    global _redis_client, _redis_checked
+    if _redis_checked:
+        return _redis_client
+    _redis_checked = True
+    settings = get_settings()
+    if not settings.redis_url:
+        return None
+    try:
+        import redis
+        _redis_client = redis.Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+        )
+    except ImportError:
+        logger.warning("REDIS_URL is set but redis package is not installed, using in-process cache")
+        _redis_client = None
+    return _redis_client
+
+
+def _get_async_redis():
+    """Get shared redis.asyncio client (connection pooled), or None if not configured."""
+    global _async_redis_client, _async_redis_checked
+    if _async_redis_checked:
+        return _async_redis_client
+    _async_redis_checked = True
+    settings = get_settings()
+    if not settings.redis_url:
+        return None
+    try:
+        import redis.asyncio
+        _async_redis_client = redis.asyncio.Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+        )
+    except ImportError:
+        logger.warning("REDIS_URL is set but redis package is not installed, using in-process cache")
+        _async_redis_client = None
+    return _async_redis_client
+
+
+def cache_is_shared() -> bool:
+    """True when entries live in Redis (visible to, and invalidated for, every worker)."""
+    return _get_redis() is not None
+
+
+def _local_get(key: str) -> Optional[str]:
+    with _local_lock:
+        entry = _local_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del _local_cache[key]
+            return None
+        return entry[1]
+
+
+def _local_set(key: str, value: str, ttl: int) -> None:
+    with _local_lock:
+        _local_cache[key] = (time.monotonic() + ttl, value)
+
+
+def _local_delete(keys) -> None:
+    with _local_lock:
+        for key in keys:
+            _local_cache.pop(key, None)
+
+
+def cache_get(key: str) -> Optional[str]:
+    """Get cached value, or None on miss."""
+    client = _get_redis()
+    if client is not None:
+        try:
+            return client.get(key)
+        except Exception as e:
+            logger.warning(f"Redis get failed for {key}: {e}")
+            return None
+    return _local_get(key)
+
+
+def cache_set(key: str, value: str, ttl: int = 60) -> None:
+    """Store value under key for ttl seconds."""
+    client = _get_redis()
+    if client is not None:
+        try:
+            client.set(key, value, ex=ttl)
+        except Exception as e:
+            logger.warning(f"Redis set failed for {key}: {e}")
+        return
+    _local_set(key, value, ttl)
+
+
+def cache_delete(*keys: str) -> bool:
+    """Invalidate one or more keys. Returns False if the Redis delete failed (entries may be stale until their TTL)."""
+    if not keys:
+        return True
+    client = _get_redis()
+    if client is not None:
+        try:
+            client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Redis delete failed for {keys}: {e}")
+            return False
+        return True
+    _local_delete(keys)
+    return True
+
+
+async def cache_get_async(key: str) -> Optional[str]:
+    """Get cached value, or None on miss (non-blocking)."""
+    client = _get_async_redis()
+    if client is not None:
+        try:
+            return await client.get(key)
+        except Exception as e:
+            logger.warning(f"Redis get failed for {key}: {e}")
+            return None
+    return _local_get(key)
+
+
+async def cache_set_async(key: str, value: str, ttl: int = 60) -> None:
+    """Store value under key for ttl seconds (non-blocking)."""
+    client = _get_async_redis()
+    if client is not None:
+        try:
+            await client.set(key, value, ex=ttl)
+        except Exception as e:
+            logger.warning(f"Redis set failed for {key}: {e}")
+        return
+    _local_set(key, value, ttl)
+
+
+async def cache_delete_async(*keys: str) -> bool:
+    """Invalidate one or more keys (non-blocking). Returns False if the Redis delete failed."""
+    if not keys:
+        return True
+    client = _get_async_redis()
+    if client is not None:
+        try:
+            await client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Redis delete failed for {keys}: {e}")
+            return False
+        return True
+    _local_delete(keys)
+    return True
@@ -0,0 +1,55 @@
+"""
+Cached lookup of the organizations a user belongs to (through active project memberships).
+Used for org-scoped access checks (e.g. document types) so they don't join
+projects x project_members on every request.
+"""
+import json
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import Project, ProjectMember
+from app.services.cache import cache_delete, cache_delete_async, cache_get, cache_is_shared, cache_set
+
+USER_ORGS_CACHE_TTL = 30  # seconds
+
+
+def _user_orgs_cache_key(user_id) -> str:
+    return f"user_orgs:{user_id}"
+
+
+def invalidate_user_org_ids(*user_ids) -> None:
+    """Drop cached org IDs after a user's project memberships change."""
+    cache_delete(*(_user_orgs_cache_key(user_id) for user_id in user_ids))
+
+
+async def invalidate_user_org_ids_async(*user_ids) -> None:
+    """invalidate_user_org_ids for async routes."""
+    await cache_delete_async(*(_user_orgs_cache_key(user_id) for user_id in user_ids))
+
+
+def get_user_org_ids(db: Session, user_id) -> List[UUID]:
+    """
+    Org IDs of projects the user is an active (non-expired) member of, cached for USER_ORGS_CACHE_TTL.
+    Only cached when the cache is shared (Redis): this is authorization data, and
+    the per-worker fallback can't be invalidated across workers.
+    """
+    key = _user_orgs_cache_key(user_id)
+    use_cache = cache_is_shared()
+    cached = cache_get(key) if use_cache else None
+    if cached is not None:
+        return [UUID(org_id) for org_id in json.loads(cached)]
+    org_ids = db.execute(
+        select(Project.org_id).distinct().join(
+            ProjectMember, Project.id == ProjectMember.project_id
+        ).where(
+            ProjectMember.user_id == user_id,
+            # expires_at is naive UTC: compare in UTC whatever the session TimeZone
+            (ProjectMember.expires_at.is_(None) | (ProjectMember.expires_at > func.timezone("UTC", func.now())))
+        )
+    ).scalars().all()
+    if use_cache:
+        cache_set(key, json.dumps([str(org_id) for org_id in org_ids]), ttl=USER_ORGS_CACHE_TTL)
+    return list(org_ids)
@@ -0,0 +1,53 @@
+"""
+Cached read responses for the projects router (/projects/my-projects and /projects/{id}/raci),
+plus each project's RACI team (active members keyed by role code).
+Values are encoded JSON, stored with short TTLs and dropped whenever the underlying
+projects, RACI matrices or memberships change.
+"""
+from app.services.cache import cache_delete, cache_delete_async
+
+MY_PROJECTS_CACHE_TTL = 60  # seconds
+RACI_CACHE_TTL = 30  # seconds
+TEAM_MEMBERS_CACHE_TTL = 30  # seconds
+
+
+def my_projects_cache_key(user_id) -> str:
+    return f"my_projects:{user_id}"
+
+
+def raci_cache_key(project_id) -> str:
+    return f"raci:{project_id}"
+
+
+def team_members_cache_key(project_id) -> str:
+    return f"team:{project_id}"
+
+
+def invalidate_my_projects(*user_ids) -> None:
+    """Drop cached /my-projects lists after a user's projects or memberships change."""
+    cache_delete(*(my_projects_cache_key(user_id) for user_id in user_ids))
+
+
+def invalidate_raci(project_id) -> None:
+    """Drop the cached /raci response after the project's RACI matrix or team changes."""
+    cache_delete(raci_cache_key(project_id))
+
+
+def invalidate_team_members(project_id) -> None:
+    """Drop the project's cached RACI team after one of its memberships changes."""
+    cache_delete(team_members_cache_key(project_id))
+
+
+async def invalidate_my_projects_async(*user_ids) -> None:
+    """invalidate_my_projects for async routes."""
+    await cache_delete_async(*(my_projects_cache_key(user_id) for user_id in user_ids))
+
+
+async def invalidate_raci_async(project_id) -> None:
+    """invalidate_raci for async routes."""
+    await cache_delete_async(raci_cache_key(project_id))
+
+
+async def invalidate_team_members_async(project_id) -> None:
+    """invalidate_team_members for async routes."""
+    await cache_delete_async(team_members_cache_key(project_id))